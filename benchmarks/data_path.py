@@ -0,0 +1,230 @@
+"""
+Benchmark of the data path: sampling, profiling and validation on synthetic tables.
+
+For every requested size a child process generates a table shaped like one of the
+case-study schemas, then times each stage and records its throughput. Peak memory
+is measured in a second child process, so tracing allocations does not slow the
+timed stages down. Results can be saved as a baseline and later compared against it; the
+comparison fails when a stage is slower or uses more memory than the tolerance allows.
+
+    python benchmarks/data_path.py --table radacct --sizes 10000,100000 --width wide
+    python benchmarks/data_path.py --save_baseline
+    python benchmarks/data_path.py --compare
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baselines" / "data_path.json"
+
+
+class Stage:
+    """
+    Times a block and records its throughput and Arrow-pool growth, or, in the memory
+    pass, only its Python-heap peak: tracemalloc slows allocations down too much to time under it.
+    """
+
+    def __init__(self, results: dict, name: str, rows: int, trace_memory: bool = False):
+        self.results, self.name, self.rows, self.trace_memory = results, name, rows, trace_memory
+
+    def __enter__(self):
+        import pyarrow as pa
+
+        self._pool = pa.default_memory_pool()
+        self._arrow_before = self._pool.bytes_allocated()
+        if self.trace_memory:
+            tracemalloc.start()
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self._started
+        if self.trace_memory:
+            _, py_peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            self.results[self.name] = {"peak_python_mb": round(py_peak / 2**20, 2)}
+            return
+        arrow_bytes = max(0, self._pool.bytes_allocated() - self._arrow_before)
+        self.results[self.name] = {
+            "seconds": round(seconds, 4),
+            "rows_per_second": round(self.rows / seconds, 1) if seconds else None,
+            "arrow_retained_mb": round(arrow_bytes / 2**20, 2),
+        }
+
+
+def build_suite(workspace, columns: list[dict]):
+    """A representative suite: not-null and uniqueness on the key, ranges on numerics."""
+    import great_expectations as gx
+
+    context = gx.get_context(mode="file", project_root_dir=str(workspace.gx_root))
+    suite = context.suites.add(gx.ExpectationSuite(name="expectation_suite"))
+    for col in columns:
+        if col["primary"]:
+            suite.add_expectation(gx.expectations.ExpectColumnValuesToBeUnique(column=col["name"]))
+        if not col["nullable"]:
+            suite.add_expectation(gx.expectations.ExpectColumnValuesToNotBeNull(column=col["name"]))
+        if col["type"] in ("int", "bigint", "decimal", "float", "double") and not col["primary"]:
+            suite.add_expectation(gx.expectations.ExpectColumnValuesToBeBetween(
+                column=col["name"], min_value=0, max_value=50_000,
+            ))
+
+
+def run_size(table: str, width: str, rows: int, sample_rows: int | None, workdir: Path,
+             trace_memory: bool = False) -> dict:
+    """
+    Generate one table and time every stage of the data path on it, or trace each stage's
+    memory with `trace_memory` (runs in a child process).
+    """
+    import synthetic
+    from qa_agent.langgraph_src import sampler
+    from qa_agent.langgraph_src.validator import validate
+    from qa_agent.langgraph_src.workspace import Workspace
+
+    os.chdir(workdir)
+    columns = synthetic.select_columns(synthetic.load_schemas()[table], width)
+    results = {}
+
+    with Stage(results, "generate", rows, trace_memory):
+        db_path = synthetic.write_sqlite(workdir / "bench.sqlite", table, columns, rows)
+
+    engine = sampler.get_engine(f"sqlite:///{db_path}")
+    read_rows = min(rows, sample_rows) if sample_rows else rows
+    limit = f" LIMIT {sample_rows}" if sample_rows else ""
+
+    with Stage(results, "sample", read_rows, trace_memory):
+        names, fetched = sampler.fetch_rows(engine, f'SELECT * FROM "{table}"{limit}')
+        arrow_table = sampler.rows_to_table(names, fetched, table)
+        del fetched
+
+    workspace = Workspace(f"bench{rows}").create()
+    with Stage(results, "write_sample", read_rows, trace_memory):
+        sampler.write_sample(arrow_table, workspace.sample_path("bench", table), table)
+
+    with Stage(results, "profile", read_rows, trace_memory):
+        sampler.build_profile(arrow_table)
+    del arrow_table
+
+    contract_path = workdir / "contract.yaml"
+    contract_path.write_text(json.dumps({"models": {table: {"fields": {}}}}))
+    build_suite(workspace, columns)
+    with Stage(results, "validate", read_rows, trace_memory):
+        validate(workspace.run_id, dataset="bench", data_contract=str(contract_path), workspace=workspace)
+
+    return {
+        "table": table,
+        "width": width,
+        "columns": len(columns),
+        "rows": rows,
+        "stages": results,
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def compare(current: list[dict], baseline: list[dict], tolerance: float) -> list[str]:
+    """Regressions of throughput or memory beyond `tolerance` (a fraction) per matching stage."""
+    regressions = []
+    base_by_key = {(b["table"], b["width"], b["rows"]): b for b in baseline}
+    for run in current:
+        base = base_by_key.get((run["table"], run["width"], run["rows"]))
+        if base is None:
+            continue
+        for stage, stats in run["stages"].items():
+            ref = base["stages"].get(stage)
+            if not ref or stage == "generate":
+                continue
+            label = f"{run['table']}/{run['width']}/{run['rows']} {stage}"
+            if ref["rows_per_second"] and stats["rows_per_second"] < ref["rows_per_second"] * (1 - tolerance):
+                regressions.append(f"{label}: {stats['rows_per_second']:.0f} rows/s vs baseline {ref['rows_per_second']:.0f}")
+            if stats["peak_python_mb"] > max(ref["peak_python_mb"], 1.0) * (1 + tolerance):
+                regressions.append(f"{label}: {stats['peak_python_mb']} MB peak vs baseline {ref['peak_python_mb']} MB")
+    return regressions
+
+
+def run_child(args, rows: int, trace_memory: bool) -> dict:
+    """One pass of the benchmark for `rows` rows in a fresh process and working directory."""
+    with tempfile.TemporaryDirectory(prefix="qa_bench_") as workdir:
+        cmd = [sys.executable, __file__, "--table", args.table, "--width", args.width,
+               "--_child_rows", str(rows), "--_child_dir", workdir]
+        if args.sample_rows:
+            cmd += ["--sample_rows", str(args.sample_rows)]
+        if trace_memory:
+            cmd.append("--_child_memory")
+        proc = subprocess.run(cmd, capture_output=True, text=True)
+    lines = [l for l in proc.stdout.splitlines() if l.startswith("RESULT ")]
+    if proc.returncode != 0 or not lines:
+        raise SystemExit(f"Benchmark for {rows} rows failed:\n{proc.stderr[-4000:]}")
+    return json.loads(lines[-1][len("RESULT "):])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--table", default="radacct", help="table from case_studies/database/*.sql")
+    parser.add_argument("--width", choices=["narrow", "wide"], default="wide")
+    parser.add_argument("--sizes", default="10000,100000", help="comma-separated row counts (up to 100000000)")
+    parser.add_argument("--sample_rows", type=int, help="rows the sampling stage reads (default: the whole table)")
+    parser.add_argument("--baseline", default=str(BASELINE_PATH))
+    parser.add_argument("--save_baseline", action="store_true")
+    parser.add_argument("--compare", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--output", help="write the results as JSON to this path")
+    parser.add_argument("--_child_rows", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--_child_dir", help=argparse.SUPPRESS)
+    parser.add_argument("--_child_memory", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args._child_rows:
+        result = run_size(args.table, args.width, args._child_rows, args.sample_rows, Path(args._child_dir),
+                          trace_memory=args._child_memory)
+        print("RESULT " + json.dumps(result))
+        return
+
+    if args.compare and not Path(args.baseline).exists():
+        raise SystemExit(f"No baseline at {args.baseline}; record one first with --save_baseline.")
+
+    runs = []
+    for rows in [int(s) for s in args.sizes.split(",")]:
+        # First the timed pass, then the memory pass with tracemalloc on
+        run, memory = (run_child(args, rows, trace_memory) for trace_memory in (False, True))
+        for stage, stats in run["stages"].items():
+            stats["peak_python_mb"] = memory["stages"][stage]["peak_python_mb"]
+        runs.append(run)
+
+        print(f"\n{args.table} ({args.width}, {run['columns']} columns), {rows:,} rows, peak RSS {run['peak_rss_mb']} MB")
+        for stage, stats in run["stages"].items():
+            print(f"  {stage:<13} {stats['seconds']:>9.3f}s  {stats['rows_per_second']:>14,.0f} rows/s  "
+                  f"{stats['peak_python_mb']:>8.1f} MB py peak  {stats['arrow_retained_mb']:>8.1f} MB arrow")
+
+    if len(runs) > 1:
+        print("\nScaling (seconds per stage by size)")
+        for stage in runs[0]["stages"]:
+            curve = ", ".join(f"{r['rows']:,}: {r['stages'][stage]['seconds']}s" for r in runs)
+            print(f"  {stage:<13} {curve}")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(runs, indent=2))
+
+    if args.save_baseline:
+        Path(args.baseline).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.baseline).write_text(json.dumps(runs, indent=2))
+        print(f"\nBaseline saved to {args.baseline}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.baseline).read_text())
+        regressions = compare(runs, baseline, args.tolerance)
+        if regressions:
+            print("\n❌ Regressions against baseline:")
+            for r in regressions:
+                print(f"  {r}")
+            raise SystemExit(1)
+        print("\n✅ No regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
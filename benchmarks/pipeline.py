@@ -0,0 +1,174 @@
+"""
+End-to-end benchmark of the workflow with recorded model responses.
+
+Every model call goes through a ReplayChatModel: run once with --record (real
+models, needs API keys) to capture responses and their latencies in a cassette
+per dataset, then replay offline as often as needed. Runs are dry runs, so no
+GitHub access is required; sampling still reads the case-study database
+(see case_studies/docker-compose.yml).
+
+For each dataset the benchmark times every workflow stage, counts tokens and
+scores the generated suite against case_studies/baseline/cli.<dataset>.json by
+precision/recall of (expectation type, column) pairs.
+
+    python benchmarks/pipeline.py --record
+    python benchmarks/pipeline.py --datasets raddb,bsadb,billing --no_latency
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import yaml
+
+CASE_STUDIES = Path(__file__).resolve().parent.parent / "case_studies"
+CASSETTE_DIR = Path(__file__).resolve().parent / "cassettes"
+
+
+def load_baseline(path: Path) -> list[dict]:
+    """The baseline files hold one or more concatenated suite JSON documents."""
+    text, decoder, suites, pos = path.read_text(), json.JSONDecoder(), [], 0
+    while pos < len(text):
+        if text[pos].isspace():
+            pos += 1
+            continue
+        suite, pos = decoder.raw_decode(text, pos)
+        suites.append(suite)
+    return suites
+
+
+def signatures(suites: list[dict]) -> set:
+    """(type, column) pairs of every expectation; table-level expectations have column None."""
+    sigs = set()
+    for suite in suites:
+        for exp in suite.get("expectations", []):
+            kwargs = exp.get("kwargs", {})
+            column = kwargs.get("column") or kwargs.get("column_A")
+            sigs.add((exp["type"], column))
+    return sigs
+
+
+def score(generated: set, baseline: set) -> dict:
+    hits = len(generated & baseline)
+    precision = hits / len(generated) if generated else 0.0
+    recall = hits / len(baseline) if baseline else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {
+        "generated": len(generated),
+        "baseline": len(baseline),
+        "matched": hits,
+        "precision": round(precision, 3),
+        "recall": round(recall, 3),
+        "f1": round(f1, 3),
+    }
+
+
+def run_dataset(dataset: str, contract: str, workdir: Path) -> dict:
+    """Run the workflow for one dataset and time each task from the task stream."""
+    from qa_agent.langgraph_src.cascade import reset_tier_stats, tier_stats
+    from qa_agent.langgraph_src.models import model_stats
+    from qa_agent.langgraph_src.workspace import Workspace
+    from qa_agent.workflow import get_checkpointed_workflow
+
+    # A fixed run id keeps the prompts (which quote run paths) identical between the
+    # recording and the replay; the stale workspace of the previous run is cleared.
+    run_id = f"bench-{dataset}"
+    shutil.rmtree(Workspace(run_id).run_dir, ignore_errors=True)
+    params = {
+        "owner": "bench", "repo": "bench", "dataset": dataset, "contract": contract,
+        "output_path": str(workdir / f"{dataset}_suite.py"),
+        "run_id": run_id, "reuse_samples": False, "dry_run": True,
+        # Fixes learned by earlier runs would change which repair prompts are sent.
+        "fix_cache_path": str(workdir / "fixes.json"),
+    }
+    wf = get_checkpointed_workflow(str(workdir / "checkpoints.sqlite"))
+    config = {"configurable": {"thread_id": run_id}}
+
+    reset_tier_stats()
+    started_at, stages = {}, []
+    started = time.perf_counter()
+    for event in wf.stream(params, config=config, stream_mode="tasks"):
+        if "result" not in event and "error" not in event:
+            started_at[event["id"]] = time.perf_counter()
+            continue
+        seconds = time.perf_counter() - started_at.pop(event["id"], started)
+        stages.append({"stage": event["name"], "seconds": round(seconds, 3), "error": event.get("error")})
+    total = time.perf_counter() - started
+
+    workspace = Workspace(run_id)
+    suites = [json.loads(p.read_text()) for p in sorted((workspace.gx_root / "gx" / "expectations").glob("*.json"))]
+    baseline = load_baseline(CASE_STUDIES / "baseline" / f"cli.{dataset}.json")
+
+    stats = model_stats()
+    return {
+        "dataset": dataset,
+        "seconds": round(total, 3),
+        "stages": stages,
+        "llm": stats,
+        "tiers": tier_stats(),
+        "tokens": sum(s["input_tokens"] + s["output_tokens"] for s in stats.values()),
+        "score": score(signatures(suites), signatures(baseline)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--datasets", default="raddb,bsadb,billing")
+    parser.add_argument("--manifest", default=str(CASE_STUDIES / "batch.yaml"))
+    parser.add_argument("--cassettes", default=str(CASSETTE_DIR))
+    parser.add_argument("--record", action="store_true", help="call the real models and record their responses")
+    parser.add_argument("--no_latency", action="store_true", help="replay without sleeping for the recorded latencies")
+    parser.add_argument("--output", help="write the results as JSON to this path")
+    args = parser.parse_args()
+
+    output = Path(args.output).resolve() if args.output else None
+    with open(args.manifest) as f:
+        contracts = {d["dataset"]: d["contract"] for d in yaml.safe_load(f)["datasets"]}
+
+    from dotenv import load_dotenv
+    from qa_agent.langgraph_src import models
+
+    load_dotenv(Path.cwd() / ".env")
+    Path(args.cassettes).mkdir(parents=True, exist_ok=True)
+    os.environ[models.CASSETTE_MODE_ENV] = "record" if args.record else "replay"
+    # Contract paths in the manifest are relative to case_studies/
+    os.chdir(CASE_STUDIES)
+
+    runs = []
+    for dataset in args.datasets.split(","):
+        os.environ[models.CASSETTE_ENV] = str(Path(args.cassettes).resolve() / f"{dataset}.jsonl")
+        models.reset_models()
+        if args.no_latency and not args.record:
+            for role in models.MODEL_ROLES:
+                models.get_model(role).simulate_latency = False
+
+        with tempfile.TemporaryDirectory(prefix="qa_pipeline_") as workdir:
+            try:
+                run = run_dataset(dataset, contracts[dataset], Path(workdir))
+            except Exception as e:
+                print(f"❌ {dataset}: {type(e).__name__}: {e}", file=sys.stderr)
+                run = {"dataset": dataset, "error": f"{type(e).__name__}: {e}"}
+        runs.append(run)
+
+        if "error" in run:
+            continue
+        s = run["score"]
+        print(f"\n{dataset}: {run['seconds']:.2f}s, {run['tokens']:,} tokens, "
+              f"precision {s['precision']:.2f} recall {s['recall']:.2f} F1 {s['f1']:.2f} "
+              f"({s['matched']}/{s['baseline']} baseline expectations)")
+        for stage in run["stages"]:
+            flag = " ❌" if stage["error"] else ""
+            print(f"  {stage['stage']:<28} {stage['seconds']:>8.3f}s{flag}")
+
+    if output:
+        output.write_text(json.dumps(runs, indent=2))
+    if any("error" in r for r in runs):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Startup-time budget for the qa_agent CLI.
+
+Measures, in fresh interpreters, how long `qa_agent --help` and the imports of
+the validation-only path take, and checks that the validation-only path does not
+pull in the LLM stack. Exits non-zero when a budget is exceeded.
+
+    python benchmarks/startup_budget.py --help_budget 0.5 --validation_budget 8.0
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+HELP_CMD = [sys.executable, "-m", "qa_agent.main", "--help"]
+
+VALIDATION_CMD = [sys.executable, "-c", """
+import sys
+import qa_agent.main
+from qa_agent.publish import run_validation_only
+import qa_agent.langgraph_src.validator
+import qa_agent.langgraph_src.github_utils
+leaked = sorted(m for m in sys.modules if m.split('.')[0] in {'langchain', 'langchain_core', 'langgraph'})
+if leaked:
+    sys.exit('validation-only path imported: ' + ', '.join(leaked[:5]))
+"""]
+
+
+def time_command(cmd: list[str], repeat: int) -> float:
+    """Median wall time of `repeat` fresh-interpreter runs."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        proc = subprocess.run(cmd, capture_output=True, text=True)
+        timings.append(time.perf_counter() - started)
+        if proc.returncode != 0:
+            raise SystemExit(f"{' '.join(cmd[:3])} failed:\n{proc.stderr or proc.stdout}")
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--help_budget", type=float, default=0.5, help="seconds for `qa_agent --help`")
+    parser.add_argument("--validation_budget", type=float, default=8.0, help="seconds to import the validation-only path")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    checks = [
+        ("qa_agent --help", HELP_CMD, args.help_budget),
+        ("validation-only imports", VALIDATION_CMD, args.validation_budget),
+    ]
+
+    failed = False
+    for name, cmd, budget in checks:
+        elapsed = time_command(cmd, args.repeat)
+        ok = elapsed <= budget
+        failed |= not ok
+        print(f"{'✅' if ok else '❌'} {name}: {elapsed:.3f}s (budget {budget:.3f}s)")
+
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Synthetic tables shaped like the case-study schemas in case_studies/database/*.sql.
+
+Columns and types are parsed from the CREATE TABLE statements and filled with
+seeded random values, chunk by chunk, so tables of 10K to 100M rows can be
+written to SQLite or parquet without holding them in memory.
+"""
+import re
+import sqlite3
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+SCHEMA_DIR = Path(__file__).resolve().parent.parent / "case_studies" / "database"
+
+_CREATE_RE = re.compile(r"CREATE TABLE `(?P<name>\w+)` \((?P<body>.*?)\n\)", re.S)
+_COLUMN_RE = re.compile(r"^\s*`(?P<name>\w+)`\s+(?P<type>[a-zA-Z]+)(?:\((?P<args>[^)]*)\))?(?P<rest>.*)$")
+
+CHUNK_ROWS = 1_000_000
+
+
+def load_schemas(schema_dir: Path = SCHEMA_DIR) -> dict:
+    """Map table name -> list of {name, type, args, nullable, primary} parsed from the SQL dumps."""
+    schemas = {}
+    for path in sorted(schema_dir.glob("*.sql")):
+        for match in _CREATE_RE.finditer(path.read_text()):
+            body = match.group("body")
+            primary = re.findall(r"PRIMARY KEY \(`(\w+)`", body)
+            columns = []
+            for line in body.splitlines():
+                col = _COLUMN_RE.match(line)
+                if not col:
+                    continue
+                columns.append({
+                    "name": col.group("name"),
+                    "type": col.group("type").lower(),
+                    "args": col.group("args"),
+                    "unsigned": "unsigned" in col.group("rest").lower(),
+                    "nullable": "NOT NULL" not in col.group("rest").upper(),
+                    "primary": col.group("name") in primary,
+                })
+            schemas[match.group("name")] = columns
+    return schemas
+
+
+def select_columns(columns: list[dict], width: str) -> list[dict]:
+    """`narrow` keeps the first five columns, `wide` keeps all of them."""
+    if width == "narrow":
+        return columns[:5]
+    if width == "wide":
+        return columns
+    raise ValueError(f"Unknown width: {width}")
+
+
+def _column_chunk(col: dict, start: int, n: int, rng: np.random.Generator) -> pa.Array:
+    kind = col["type"]
+    if col["primary"]:
+        return pa.array(np.arange(start + 1, start + n + 1, dtype=np.int64))
+
+    if kind in ("int", "integer", "bigint", "smallint", "mediumint", "tinyint"):
+        high = 2 if kind == "tinyint" else 100_000
+        values = pa.array(rng.integers(0, high, n, dtype=np.int64))
+    elif kind in ("decimal", "float", "double"):
+        values = pa.array(np.round(rng.gamma(2.0, 50.0, n), 2))
+    elif kind in ("datetime", "timestamp"):
+        seconds = rng.integers(1_600_000_000, 1_700_000_000, n, dtype=np.int64)
+        values = pa.array(seconds.astype("datetime64[s]"))
+    elif kind == "date":
+        days = rng.integers(18_000, 19_500, n, dtype=np.int64)
+        values = pa.array(days.astype("datetime64[D]"))
+    elif kind == "enum" and col["args"]:
+        vocab = np.array([v.strip().strip("'") for v in col["args"].split(",")])
+        values = pa.array(vocab[rng.integers(0, len(vocab), n)])
+    else:
+        # Low-cardinality strings for short columns, near-unique ones for long columns
+        size = int(col["args"]) if col["args"] and col["args"].isdigit() else 64
+        cardinality = 16 if size <= 32 else 10_000
+        vocab = np.array([f"{col['name']}_{i}" for i in range(cardinality)])
+        values = pa.array(vocab[rng.integers(0, cardinality, n)])
+
+    if col["nullable"]:
+        mask = pa.array(rng.random(n) < 0.05)
+        values = pc.if_else(mask, pa.scalar(None, values.type), values)
+    return values
+
+
+def generate_batches(columns: list[dict], rows: int, seed: int = 42):
+    """Yield record batches of at most CHUNK_ROWS rows."""
+    rng = np.random.default_rng(seed)
+    for start in range(0, rows, CHUNK_ROWS):
+        n = min(CHUNK_ROWS, rows - start)
+        arrays = [_column_chunk(col, start, n, rng) for col in columns]
+        yield pa.RecordBatch.from_arrays(arrays, names=[c["name"] for c in columns])
+
+
+def write_sqlite(path: Path, table_name: str, columns: list[dict], rows: int, seed: int = 42) -> Path:
+    conn = sqlite3.connect(path)
+    col_defs = ", ".join(f'"{c["name"]}" {c["type"].upper()}' for c in columns)
+    conn.execute(f'DROP TABLE IF EXISTS "{table_name}"')
+    conn.execute(f'CREATE TABLE "{table_name}" ({col_defs})')
+    placeholders = ", ".join("?" for _ in columns)
+    for batch in generate_batches(columns, rows, seed):
+        pydict = batch.to_pydict()
+        records = zip(*(
+            [str(v) if hasattr(v, "isoformat") else v for v in pydict[c["name"]]]
+            for c in columns
+        ))
+        conn.executemany(f'INSERT INTO "{table_name}" VALUES ({placeholders})', records)
+        conn.commit()
+    conn.close()
+    return path
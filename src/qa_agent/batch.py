@@ -0,0 +1,104 @@
+import argparse
+import json
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+
+import yaml
+
+from qa_agent.workflow import run_workflow
+
+
+def load_manifest(path: str) -> list[dict]:
+    """
+    Load a batch manifest and expand it into per-dataset workflow params.
+
+    Top-level keys (owner, repo, base_branch, mode, ...) are defaults that each
+    entry under `datasets` can override. `output_path` defaults to
+    expectations/<dataset>_suite.py.
+    """
+    with open(path) as f:
+        manifest = yaml.safe_load(f)
+
+    defaults = {k: v for k, v in manifest.items() if k != "datasets"}
+    jobs = []
+    for entry in manifest.get("datasets") or []:
+        params = {"base_branch": "main", "mode": "default", "run_id": None, **defaults, **entry}
+        params.setdefault("output_path", f"expectations/{params['dataset']}_suite.py")
+        missing = [k for k in ("owner", "repo", "dataset", "contract") if not params.get(k)]
+        if missing:
+            raise ValueError(f"Manifest entry {entry} is missing {', '.join(missing)}")
+        jobs.append(params)
+    if not jobs:
+        raise ValueError("Manifest does not list any datasets")
+    return jobs
+
+
+def run_job(params: dict) -> dict:
+    """Run one dataset through the workflow, capturing failures instead of raising."""
+    started = time.perf_counter()
+    try:
+        run_workflow(params)
+        status, error = "ok", None
+    except Exception as e:
+        traceback.print_exc()
+        status, error = "failed", f"{type(e).__name__}: {e}"
+    return {
+        "dataset": params["dataset"],
+        "contract": params["contract"],
+        "status": status,
+        "seconds": round(time.perf_counter() - started, 2),
+        "error": error,
+    }
+
+
+def run_batch(jobs: list[dict], workers: int = 1) -> list[dict]:
+    """
+    Run all jobs on a bounded thread pool. Model clients, DB engines and the
+    GitHub client are module-level and therefore shared by every job.
+    """
+    summary = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(run_job, params): params for params in jobs}
+        for future in as_completed(futures):
+            outcome = future.result()
+            print(f"{'✅' if outcome['status'] == 'ok' else '❌'} {outcome['dataset']} ({outcome['seconds']}s)")
+            summary.append(outcome)
+    return summary
+
+
+def print_summary(summary: list[dict]):
+    failed = [s for s in summary if s["status"] != "ok"]
+    print(f"\nBatch finished: {len(summary) - len(failed)}/{len(summary)} datasets succeeded")
+    for s in sorted(summary, key=lambda s: s["dataset"]):
+        line = f"  {s['dataset']:<24} {s['status']:<7} {s['seconds']:>8}s"
+        if s["error"]:
+            line += f"  {s['error']}"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the QA workflow for every dataset in a manifest.")
+    parser.add_argument("--manifest", required=1)
+    # Jobs run one at a time unless asked otherwise: concurrent GX runs in one process are not proven safe
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    jobs = load_manifest(args.manifest)
+    summary = run_batch(jobs, workers=args.workers)
+    print_summary(summary)
+
+    batch_id = datetime.now().strftime("%Y%m%d%H%M%S")
+    summary_path = Path(f"artifacts/batch/{batch_id}.summary.json")
+    summary_path.parent.mkdir(parents=True, exist_ok=True)
+    summary_path.write_text(json.dumps(summary, indent=2))
+    print(f"Summary saved to {summary_path}")
+
+    if any(s["status"] != "ok" for s in summary):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+import math
+import re
+import time
+from dataclasses import dataclass
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Two-sided 95% confidence
+Z = 1.96
+CONFIDENCE = 0.95
+# A threshold is settled once its interval excludes the target or is at most this wide on each side
+DEFAULT_MARGIN = 0.02
+MIN_ROWS = 100
+MAX_ROWS = 50_000
+TIME_BUDGET_SECONDS = 30.0
+
+# ODCS comparison keys of library metrics
+_BOUNDS = ("mustBeLessThan", "mustBeLessOrEqualTo", "mustBeLessThanOrEqualTo", "mustBe")
+_DESCRIPTION_RE = re.compile(
+    r"(\d+(?:\.\d+)?)\s*%\s+of\s+(?:the\s+)?(?:\w+\s+)*?(?:values\s+)?(?:must|should)\s+be\s+"
+    r"(less than|greater than|at most|at least|below|above)\s+(-?\d+(?:\.\d+)?)", re.I,
+)
+_COMPARISONS = {
+    "less than": pc.less, "below": pc.less, "at most": pc.less_equal,
+    "greater than": pc.greater, "above": pc.greater, "at least": pc.greater_equal,
+}
+
+
+@dataclass(frozen=True)
+class Threshold:
+    """
+    A contract rule stating how large a share of rows may fail it: `max_failure_rate` 0.05
+    for "95% of prices must be less than 300", 0.0 for rules that allow no failing rows.
+    `kind` says how a failing row is recognised: nulls, invalid (not in `values`),
+    pattern, comparison, or stated (not computable from the rows).
+    """
+    column: str | None
+    max_failure_rate: float
+    kind: str
+    values: tuple = ()
+    pattern: str | None = None
+    comparison: str | None = None
+    bound: float | None = None
+    source: str = ""
+
+
+def wilson_interval(failures: int, n: int, z: float = Z) -> tuple[float, float]:
+    """Wilson score interval of a proportion; (0, 1) without observations."""
+    if n == 0:
+        return 0.0, 1.0
+    p = failures / n
+    denominator = 1 + z * z / n
+    center = (p + z * z / (2 * n)) / denominator
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denominator
+    return max(0.0, center - half), min(1.0, center + half)
+
+
+def _library_threshold(column: str | None, rule: dict) -> Threshold | None:
+    # The bound of a `type: sql` rule applies to its query's result (e.g. a quantile), not to a count of rows
+    if rule.get("type") == "sql":
+        return None
+    bound = next((rule[k] for k in _BOUNDS if rule.get(k) is not None), None)
+    if bound is None:
+        return None
+    # Without `unit: percent` the bound counts rows, which a sample can only read as "no failing rows"
+    rate = float(bound) / 100 if rule.get("unit") == "percent" else 0.0
+    metric, arguments = rule.get("metric"), rule.get("arguments") or {}
+    source = rule.get("description") or metric or ""
+    if metric in ("nullValues", "missingValues"):
+        return Threshold(column, rate, "nulls", source=source)
+    if metric == "invalidValues" and arguments.get("validValues"):
+        return Threshold(column, rate, "invalid", values=tuple(arguments["validValues"]), source=source)
+    if metric == "invalidValues" and arguments.get("pattern"):
+        return Threshold(column, rate, "pattern", pattern=arguments["pattern"], source=source)
+    return Threshold(column, rate, "stated", source=source)
+
+
+def _mostly_threshold(column: str | None, rule: dict) -> Threshold | None:
+    if rule.get("mostly") is None:
+        return None
+    rate = round(1.0 - float(rule["mostly"]), 6)
+    source = rule.get("description") or rule.get("rule") or ""
+    kind = rule.get("rule")
+    if kind == "not_null":
+        return Threshold(column, rate, "nulls", source=source)
+    if kind == "accepted_values" and rule.get("values"):
+        return Threshold(column, rate, "invalid", values=tuple(rule["values"]), source=source)
+    if kind == "regex" and rule.get("pattern"):
+        return Threshold(column, rate, "pattern", pattern=rule["pattern"], source=source)
+    return Threshold(column, rate, "stated", source=source)
+
+
+def _description_threshold(column: str | None, text: str) -> Threshold | None:
+    match = _DESCRIPTION_RE.search(text or "")
+    if not match or column is None:
+        return None
+    share, comparison, bound = match.groups()
+    return Threshold(column, round(1.0 - float(share) / 100, 6), "comparison",
+                     comparison=comparison.lower(), bound=float(bound), source=text)
+
+
+def contract_thresholds(contract: dict, table_name: str) -> list[Threshold]:
+    """
+    Thresholds a model's contract states, from model- and field-level quality rules:
+    ODCS library metrics with mustBeLessThan (and `unit: percent`), rules with `mostly`,
+    and descriptions like "95% of prices must (or should) be less than 300", which is how
+    `type: sql` rules are read.
+    """
+    models = contract.get("models") or contract.get("schema") or {}
+    model = models.get(table_name, {}) if isinstance(models, dict) else next(
+        (m for m in models if m.get("name") == table_name), {}
+    )
+    model = model or {}
+    fields = model.get("fields") or model.get("properties") or {}
+    if isinstance(fields, list):
+        fields = {f.get("name"): f for f in fields}
+
+    scoped = [(rule.get("field"), rule) for rule in model.get("quality") or []]
+    for name, field in fields.items():
+        scoped.extend((name, rule) for rule in (field or {}).get("quality") or [])
+
+    thresholds = []
+    for column, rule in scoped:
+        threshold = (_library_threshold(column, rule) or _mostly_threshold(column, rule)
+                     or _description_threshold(column, rule.get("description")))
+        if threshold is not None:
+            thresholds.append(threshold)
+    return list(dict.fromkeys(thresholds))
+
+
+def count_failures(threshold: Threshold, table: pa.Table) -> tuple[int, int] | None:
+    """(failing rows, rows the rule applies to) in `table`, or None when it cannot be computed."""
+    if threshold.kind == "stated" or threshold.column not in table.column_names:
+        return None
+    column = table[threshold.column]
+    if threshold.kind == "nulls":
+        return column.null_count, len(column)
+    # Like GX, value rules only look at non-null values
+    values = column.drop_null()
+    try:
+        if threshold.kind == "invalid":
+            allowed = pa.array(list(threshold.values))
+            if allowed.type != values.type:
+                values, allowed = values.cast(pa.string()), allowed.cast(pa.string())
+            passing = pc.is_in(values, value_set=allowed)
+        elif threshold.kind == "pattern":
+            passing = pc.match_substring_regex(values.cast(pa.string()), threshold.pattern)
+        else:
+            passing = _COMPARISONS[threshold.comparison](values, pa.scalar(threshold.bound).cast(values.type))
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError):
+        return None
+    return len(values) - pc.sum(passing).as_py() if len(values) else 0, len(values)
+
+
+def assess(threshold: Threshold, table: pa.Table, margin: float = DEFAULT_MARGIN) -> dict:
+    """
+    Confidence reached for one threshold on a sample. Rules that cannot be computed from the rows
+    are assessed as if their failure rate sat right at the threshold, the widest case that matters.
+    """
+    counted = count_failures(threshold, table)
+    failures, n = counted if counted is not None else (round(threshold.max_failure_rate * len(table)), len(table))
+    low, high = wilson_interval(failures, n)
+    half_width = (high - low) / 2
+    decided = high < threshold.max_failure_rate or low > threshold.max_failure_rate
+    return {
+        "column": threshold.column,
+        "kind": threshold.kind,
+        "source": threshold.source,
+        "max_failure_rate": threshold.max_failure_rate,
+        "rows": n,
+        "failures": failures if counted is not None else None,
+        "interval": [round(low, 4), round(high, 4)],
+        "half_width": round(half_width, 4),
+        "confidence": CONFIDENCE,
+        "settled": decided or half_width <= margin,
+        # Whether the sample shows the rule met (True), broken (False), or cannot tell (None)
+        "meets_threshold": (True if high < threshold.max_failure_rate else False if decided else None)
+                           if counted is not None else None,
+    }
+
+
+def sample_adaptively(batches, thresholds: list[Threshold], min_rows: int = MIN_ROWS, max_rows: int = MAX_ROWS,
+                      time_budget: float = TIME_BUDGET_SECONDS, margin: float = DEFAULT_MARGIN) -> tuple[pa.Table, dict]:
+    """
+    Draw batches until every threshold is settled at 95% confidence, or the row or time budget
+    runs out. Returns the sample and a summary of the confidence achieved, for the profile.
+    The intervals are only confidence statements about the table when `batches` yields its
+    rows as a random sample (`iter_sample_batches`), not in storage order.
+    """
+    started = time.perf_counter()
+    held, rows, stopped = [], 0, "exhausted"
+    assessments = []
+    try:
+        for batch in batches:
+            if rows + len(batch) > max_rows:
+                batch = batch.slice(0, max_rows - rows)
+            held.append(batch)
+            rows += len(batch)
+            if rows < min_rows:
+                continue
+            table = pa.concat_tables(held)
+            assessments = [assess(t, table, margin) for t in thresholds]
+            if all(a["settled"] for a in assessments):
+                stopped = "settled"
+                break
+            if rows >= max_rows:
+                stopped = "max_rows"
+                break
+            if time.perf_counter() - started > time_budget:
+                stopped = "time_budget"
+                break
+    finally:
+        if hasattr(batches, "close"):
+            batches.close()  # ends the source's streaming query early
+
+    if not held:
+        raise ValueError("No rows to sample")
+    table = pa.concat_tables(held)
+    if stopped == "exhausted" or not assessments:
+        assessments = [assess(t, table, margin) for t in thresholds]
+    return table, {
+        "rows": len(table),
+        "stopped": stopped,
+        "seconds": round(time.perf_counter() - started, 3),
+        "thresholds": assessments,
+    }
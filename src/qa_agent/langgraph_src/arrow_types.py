@@ -0,0 +1,91 @@
+import re
+
+import pyarrow as pa
+
+_ARGS_RE = re.compile(r"\(([^)]*)\)")
+
+_CONVERSION_ERRORS = (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError, TypeError, OverflowError)
+
+_SIGNED_INTS = {
+    "tinyint": pa.int8(), "smallint": pa.int16(), "mediumint": pa.int32(),
+    "int": pa.int32(), "integer": pa.int32(), "bigint": pa.int64(), "year": pa.int16(),
+}
+_UNSIGNED_INTS = {
+    "tinyint": pa.uint8(), "smallint": pa.uint16(), "mediumint": pa.uint32(),
+    "int": pa.uint32(), "integer": pa.uint32(), "bigint": pa.uint64(),
+}
+_STRINGS = ("char", "varchar", "nchar", "nvarchar", "text", "tinytext", "mediumtext", "longtext",
+            "enum", "set", "json", "uuid", "string", "character varying", "clob")
+_BINARIES = ("binary", "varbinary", "blob", "tinyblob", "mediumblob", "longblob", "bytea")
+
+
+def arrow_type(declared: str | None) -> pa.DataType | None:
+    """
+    Arrow type for a declared SQL type such as "DECIMAL(10, 2)", "BIGINT(20) UNSIGNED"
+    or a contract physicalType like "int(10) unsigned". None when the type is unknown.
+    """
+    if not declared:
+        return None
+    declared = declared.lower()
+    match = _ARGS_RE.search(declared)
+    args = [a.strip() for a in match.group(1).split(",") if a.strip()] if match else []
+    words = _ARGS_RE.sub(" ", declared).split()
+    unsigned = "unsigned" in words
+    name = " ".join(w for w in words if w not in ("unsigned", "signed", "zerofill"))
+
+    if name in _SIGNED_INTS:
+        return (_UNSIGNED_INTS if unsigned else _SIGNED_INTS).get(name, pa.int64())
+    if name in ("decimal", "numeric", "dec", "fixed"):
+        precision = int(args[0]) if args else 10
+        scale = int(args[1]) if len(args) > 1 else 0
+        return pa.decimal128(precision, scale) if precision <= 38 else pa.decimal256(precision, scale)
+    if name in ("float", "double", "double precision", "real"):
+        return pa.float64()
+    if name in ("datetime", "timestamp"):
+        return pa.timestamp("us")
+    if name == "date":
+        return pa.date32()
+    if name == "time":
+        # MySQL TIME values are durations (they can exceed 24h); drivers return timedelta
+        return pa.duration("us")
+    if name in ("bool", "boolean", "bit"):
+        return pa.bool_()
+    if name in _STRINGS:
+        return pa.string()
+    if name in _BINARIES:
+        return pa.binary()
+    return None
+
+
+def column_types(columns: list[str], declared_types: dict, physical_types: dict | None = None) -> dict:
+    """Target Arrow type per column: the database's declared type first, the contract's physicalType second."""
+    physical_types = physical_types or {}
+    types = {}
+    for col in columns:
+        target = arrow_type(declared_types.get(col)) or arrow_type(physical_types.get(col))
+        if target is not None:
+            types[col] = target
+    return types
+
+
+def to_arrow_column(values: list, target: pa.DataType | None) -> pa.Array:
+    """
+    Convert one column of Python values in a single pass. Falls back to inference and
+    then to strings, so a value that does not fit only affects its own column.
+    """
+    if target is not None:
+        try:
+            return pa.array(values, type=target)
+        except _CONVERSION_ERRORS:
+            pass
+    try:
+        inferred = pa.array(values)
+    except _CONVERSION_ERRORS:
+        return pa.array([str(v) if v is not None else None for v in values], type=pa.string())
+    if target is not None:
+        # e.g. SQLite hands back floats for DECIMAL and strings for DATETIME columns
+        try:
+            return inferred.cast(target)
+        except _CONVERSION_ERRORS:
+            pass
+    return inferred
@@ -0,0 +1,146 @@
+import ast
+import json
+import re
+import statistics
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from qa_agent.langgraph_src.models import get_model, model_name
+
+# Tiers tried in order: the fast model first, the task's own (strong) role last
+FAST_TIER = "fast"
+# Cheaper tier tried first, per role. The writer's default model is already a cheap one, so it
+# only gets a fast tier when WRITER_FAST_MODEL is set.
+FAST_TIERS = {"coder": FAST_TIER, "writer": "writer_fast"}
+TIER_LOG = "artifacts/model_tiers.jsonl"
+
+# Errors a fast model repairs reliably: the fix is local to a name, an import or the syntax
+TRIVIAL_ERRORS = ("ModuleNotFoundError", "ImportError", "NameError", "SyntaxError", "IndentationError")
+_UNEXPECTED_KWARG_RE = re.compile(r"TypeError: .*(unexpected keyword argument|missing \d+ required)")
+
+# PR bodies are cheap to write when the results and both suites fit in a short prompt
+SHORT_PROMPT_CHARS = 12_000
+MIN_PR_BODY_CHARS = 80
+
+_calls: list[dict] = []
+_calls_lock = threading.Lock()
+
+
+def is_trivial_error(stderr: str) -> bool:
+    """Whether a traceback ends in an error the fast tier can be trusted with."""
+    lines = [line for line in stderr.strip().splitlines() if line.strip()]
+    if not lines:
+        return False
+    last = lines[-1].strip()
+    return last.startswith(TRIVIAL_ERRORS) or bool(_UNEXPECTED_KWARG_RE.match(last))
+
+
+def compiles(code: str) -> bool:
+    try:
+        ast.parse(code)
+    except SyntaxError:
+        return False
+    return True
+
+
+def record(task: str, tier: str, seconds: float | None, accepted: bool, log_path: str | None = TIER_LOG,
+           stage: str = "call"):
+    """
+    Keep one outcome in memory and append it to the cross-run tier log: a model call's
+    (`stage="call"`), or whether its output later held up when run (`stage="run"`, no latency).
+    """
+    entry = {"task": task, "tier": tier, "stage": stage, "accepted": accepted}
+    if seconds is not None:
+        entry["seconds"] = round(seconds, 3)
+    with _calls_lock:
+        _calls.append(entry)
+        if log_path:
+            Path(log_path).parent.mkdir(parents=True, exist_ok=True)
+            with open(log_path, "a") as f:
+                f.write(json.dumps({**entry, "at": datetime.now().isoformat(timespec="seconds")}) + "\n")
+
+
+def record_outcome(task: str, tier: str, ran: bool):
+    """Whether the output a tier produced for `task` worked when run, e.g. a fixed suite that executes."""
+    record(task, tier, None, ran, stage="run")
+
+
+def fast_tier(role: str) -> str | None:
+    """The tier to try before `role`'s model, or None when the role has none, it is unset or the same model."""
+    tier = FAST_TIERS.get(role)
+    if tier is None or tier == role or model_name(tier) in (None, model_name(role)):
+        return None
+    return tier
+
+
+def cascade(task: str, role: str, call, accept, fast_first: bool = True) -> tuple[str, str]:
+    """
+    Run `call(model)` on the role's fast tier and escalate to `role`'s model when `accept` rejects
+    the output or the call raises (a rate limit, a timeout, a rejected parameter). Returns the
+    output and the tier that produced it; the last tier's output is returned whether or not it
+    is accepted, and its errors propagate.
+    """
+    fast = fast_tier(role) if fast_first else None
+    tiers = [fast, role] if fast else [role]
+    for i, tier in enumerate(tiers):
+        last = i == len(tiers) - 1
+        started = time.perf_counter()
+        try:
+            output = call(get_model(tier))
+        except Exception as e:
+            record(task, tier, time.perf_counter() - started, False)
+            if last:
+                raise
+            print(f"❌ {task}: {tier} tier failed ({type(e).__name__}: {e}), escalating to {tiers[i + 1]}.")
+            continue
+        accepted = bool(accept(output))
+        record(task, tier, time.perf_counter() - started, accepted)
+        if accepted or last:
+            return output, tier
+        print(f"❌ {task}: {tier} tier output rejected, escalating to {tiers[i + 1]}.")
+
+
+def _rate(entries: list[dict]) -> float | None:
+    return round(sum(e["accepted"] for e in entries) / len(entries), 3) if entries else None
+
+
+def tier_stats(calls: list[dict] | None = None) -> dict:
+    """
+    Per task and tier (this process's calls by default): calls, the share accepted by the static
+    check, median latency, and the share of outputs that worked when run, where that is recorded.
+    """
+    if calls is None:
+        with _calls_lock:
+            calls = list(_calls)
+    grouped: dict = {}
+    for c in calls:
+        grouped.setdefault(c["task"], {}).setdefault(c["tier"], []).append(c)
+    stats = {}
+    for task, tiers in grouped.items():
+        stats[task] = {}
+        for tier, entries in tiers.items():
+            made = [e for e in entries if e.get("stage", "call") == "call"]
+            ran = [e for e in entries if e.get("stage") == "run"]
+            stats[task][tier] = {
+                "calls": len(made),
+                "success_rate": _rate(made),
+                "median_seconds": round(statistics.median(e["seconds"] for e in made), 3) if made else None,
+                "run_success_rate": _rate(ran),
+            }
+    return stats
+
+
+def load_tier_log(log_path: str = TIER_LOG) -> list[dict]:
+    """Every call recorded in the tier log, e.g. `tier_stats(load_tier_log())` for a deployment."""
+    path = Path(log_path)
+    if not path.exists():
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def reset_tier_stats():
+    with _calls_lock:
+        _calls.clear()
@@ -0,0 +1,284 @@
+import threading
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv
+import pyarrow.dataset as ds
+import pyarrow.fs
+import sqlalchemy
+
+from qa_agent.langgraph_src.arrow_types import column_types, to_arrow_column
+
+# Data contract server type -> SQLAlchemy driver
+SQL_DRIVERS = {
+    "mysql": "mysql+pymysql",
+    "postgres": "postgresql+psycopg2",
+    "postgresql": "postgresql+psycopg2",
+    "sqlserver": "mssql+pyodbc",
+    "oracle": "oracle+oracledb",
+    "sqlite": "sqlite",
+}
+
+# Server types scanned from local files with pyarrow.dataset
+FILE_FORMATS = ("parquet", "csv")
+
+# Rows per batch when streaming whole columns
+BATCH_ROWS = 100_000
+
+# Random samples are read bucket by bucket: rows whose key modulo SAMPLE_BUCKETS is the bucket
+SAMPLE_BUCKETS = 100
+
+_engines: dict = {}
+_engines_lock = threading.Lock()
+
+
+def get_engine(uri: str) -> sqlalchemy.Engine:
+    """Return a pooled engine per URI so repeated samples in one process share connections."""
+    with _engines_lock:
+        if uri not in _engines:
+            _engines[uri] = sqlalchemy.create_engine(uri, pool_pre_ping=True)
+        return _engines[uri]
+
+
+def fetch_rows(engine, query) -> tuple[list[str], list]:
+    """Execute a sampling query (SQL text or a SQLAlchemy select) and return its column names and rows."""
+    with engine.connect() as conn:
+        result = conn.execute(sqlalchemy.text(query) if isinstance(query, str) else query)
+        columns = list(result.keys())
+        rows = result.fetchall()
+    return columns, rows
+
+
+def rows_to_table(columns: list[str], rows: list, table_name: str, types: dict | None = None) -> pa.Table:
+    """
+    Convert DB rows to a pyarrow Table, column by column. Columns with a target type in
+    `types` are converted straight to it; a column whose values do not fit falls back on
+    its own (inferred type, then strings) without affecting the others.
+    """
+    types = types or {}
+    arrays, fallbacks = [], []
+    for i, col in enumerate(columns):
+        values = [row[i] for row in rows]
+        array = to_arrow_column(values, types.get(col))
+        if types.get(col) is not None and array.type != types[col]:
+            fallbacks.append(f"{col} ({types[col]} -> {array.type})")
+        arrays.append(array)
+    if fallbacks:
+        print(f"Warning: {table_name}: columns not matching their declared type: {', '.join(fallbacks)}")
+    return pa.Table.from_arrays(arrays, names=list(columns))
+
+
+class SqlConnector:
+    """Samples tables through SQLAlchemy; works for any dialect with an installed driver."""
+
+    def __init__(self, uri: str):
+        self.uri = uri
+        self.engine = get_engine(uri)
+        self._declared: dict = {}
+
+    @classmethod
+    def from_server(cls, server: dict) -> "SqlConnector":
+        if server.get("uri"):
+            return cls(server["uri"])
+        kind = server["type"]
+        if kind == "sqlite":
+            return cls(f"sqlite:///{server.get('path') or server['database']}")
+        url = sqlalchemy.URL.create(
+            SQL_DRIVERS[kind],
+            username=server.get("username"),
+            password=str(server["password"]) if server.get("password") is not None else None,
+            host=server.get("host"),
+            port=server.get("port"),
+            database=server.get("database"),
+        )
+        return cls(url.render_as_string(hide_password=False))
+
+    def scan(self, table_name: str, columns: list[str] | None = None, filter: str | None = None,
+             limit: int | None = None, physical_types: dict | None = None) -> pa.Table:
+        """
+        Rows of a table; `columns` and the SQL `filter` are pushed into the query. Values are
+        converted once to Arrow types derived from the declared column types, with the
+        contract's `physical_types` for columns the database does not describe.
+        """
+        try:
+            declared = self.declared_types(table_name)
+        except Exception as e:
+            print(f"Warning: Could not read declared types of {table_name}: {e}")
+            declared = {}
+        if columns and declared:
+            # Contract fields missing from the table are left out rather than failing the query
+            columns = [c for c in columns if c in declared]
+        projection = [sqlalchemy.column(c) for c in columns] if columns else [sqlalchemy.text("*")]
+        # Built with SQLAlchemy so quoting and LIMIT/TOP/FETCH follow the dialect
+        query = sqlalchemy.select(*projection).select_from(sqlalchemy.table(table_name))
+        if filter:
+            query = query.where(sqlalchemy.text(filter))
+        if limit:
+            query = query.limit(limit)
+        names, rows = fetch_rows(self.engine, query)
+        return rows_to_table(names, rows, table_name, column_types(names, declared, physical_types))
+
+    def iter_batches(self, table_name: str, columns: list[str] | None, batch_size: int = BATCH_ROWS,
+                     physical_types: dict | None = None, where=None):
+        """
+        Stream columns of a table (all of them if None) as Arrow tables of at most `batch_size` rows,
+        optionally only the rows matching the SQLAlchemy clause `where`.
+        """
+        declared = self.declared_types(table_name)
+        columns = [c for c in columns if c in declared] if columns else list(declared)
+        query = sqlalchemy.select(*[sqlalchemy.column(c) for c in columns]).select_from(sqlalchemy.table(table_name))
+        if where is not None:
+            query = query.where(where)
+        types = column_types(columns, declared, physical_types)
+        with self.engine.connect() as conn:
+            result = conn.execution_options(stream_results=True, max_row_buffer=batch_size).execute(query)
+            names = list(result.keys())
+            while rows := result.fetchmany(batch_size):
+                yield rows_to_table(names, rows, table_name, types)
+
+    def iter_sample_batches(self, table_name: str, columns: list[str] | None, key: str | None,
+                            batch_size: int = BATCH_ROWS, physical_types: dict | None = None, seed: int = 42):
+        """
+        Like iter_batches, for a random sample that can be stopped at any batch: rows are read bucket
+        by bucket (`key` modulo SAMPLE_BUCKETS, buckets in an order drawn from `seed`), each bucket
+        one filtered query without sorting, so the source returns little more than what is read.
+        Without an integer `key` the table is streamed in storage order.
+        """
+        if key is None:
+            print(f"Warning: {table_name} has no integer key to sample by, reading it in storage order")
+            yield from self.iter_batches(table_name, columns, batch_size, physical_types)
+            return
+        for bucket in np.random.default_rng(seed).permutation(SAMPLE_BUCKETS):
+            where = (sqlalchemy.column(key) % SAMPLE_BUCKETS) == int(bucket)
+            yield from self.iter_batches(table_name, columns, batch_size, physical_types, where=where)
+
+    def declared_types(self, table_name: str) -> dict:
+        """Column types as the dialect spells them, e.g. "BIGINT(20) UNSIGNED"; cached per table."""
+        if table_name not in self._declared:
+            insp = sqlalchemy.inspect(self.engine)
+            dialect = self.engine.dialect
+            self._declared[table_name] = {
+                col["name"]: _compile_type(col["type"], dialect) for col in insp.get_columns(table_name)
+            }
+        return self._declared[table_name]
+
+
+def _compile_type(sql_type, dialect) -> str:
+    try:
+        return sql_type.compile(dialect=dialect)
+    except Exception:
+        return str(sql_type)
+
+
+class ArrowDatasetConnector:
+    """
+    Scans local parquet or CSV files with pyarrow.dataset.
+
+    Column projection and filters are pushed into the scan (parquet skips row groups
+    via their statistics), files are memory-mapped, and batches stay in Arrow memory
+    without ever being converted to Python rows.
+
+    `path` is either a template containing `{model}`, a directory holding
+    `<model>.<format>` files or `<model>/` partition folders, or a single file.
+    """
+
+    def __init__(self, path: str, format: str = "parquet", options: dict | None = None):
+        if format not in FILE_FORMATS:
+            raise ValueError(f"Unsupported file format: {format}")
+        self.path = path
+        self.format = format
+        self.options = options or {}
+        self.filesystem = pyarrow.fs.LocalFileSystem(use_mmap=True)
+        self._datasets: dict = {}
+
+    @classmethod
+    def from_server(cls, server: dict) -> "ArrowDatasetConnector":
+        fmt = server.get("format") or server["type"]
+        return cls(server["path"], format=fmt, options=server.get("options"))
+
+    def table_path(self, table_name: str) -> str:
+        if "{model}" in self.path:
+            return self.path.format(model=table_name)
+        base = Path(self.path)
+        if base.is_dir():
+            single = base / f"{table_name}.{self.format}"
+            return str(single if single.exists() else base / table_name)
+        return str(base)
+
+    def dataset(self, table_name: str) -> ds.Dataset:
+        if table_name not in self._datasets:
+            if self.format == "csv":
+                fmt = ds.CsvFileFormat(parse_options=pa.csv.ParseOptions(**self.options))
+            else:
+                fmt = ds.ParquetFileFormat()
+            self._datasets[table_name] = ds.dataset(
+                self.table_path(table_name), format=fmt, filesystem=self.filesystem, partitioning="hive",
+            )
+        return self._datasets[table_name]
+
+    def scan(self, table_name: str, columns: list[str] | None = None, filter: ds.Expression | None = None,
+             limit: int | None = None, physical_types: dict | None = None) -> pa.Table:
+        """
+        Rows of a table as Arrow; `columns` and the dataset `filter` expression are pushed down.
+        The files carry their own types, so `physical_types` is not needed here.
+        """
+        dataset = self.dataset(table_name)
+        if columns:
+            columns = [c for c in columns if c in dataset.schema.names]
+        scanner = dataset.scanner(columns=columns or None, filter=filter)
+        return scanner.head(limit) if limit else scanner.to_table()
+
+    def iter_batches(self, table_name: str, columns: list[str] | None, batch_size: int = BATCH_ROWS,
+                     physical_types: dict | None = None):
+        """Stream columns of a table (all of them if None) as Arrow tables of at most `batch_size` rows."""
+        dataset = self.dataset(table_name)
+        if columns:
+            columns = [c for c in columns if c in dataset.schema.names]
+        for batch in dataset.to_batches(columns=columns, batch_size=batch_size):
+            yield pa.Table.from_batches([batch])
+
+    def iter_sample_batches(self, table_name: str, columns: list[str] | None, key: str | None = None,
+                            batch_size: int = BATCH_ROWS, physical_types: dict | None = None, seed: int = 42):
+        """
+        Like iter_batches, for a random sample that can be stopped at any batch: row groups (whole
+        files for CSV) are read in an order drawn from `seed`, each with its rows shuffled, so only
+        the row groups the caller gets to are read. `key` is not needed here.
+        """
+        dataset = self.dataset(table_name)
+        if columns:
+            columns = [c for c in columns if c in dataset.schema.names]
+        pieces = []
+        for fragment in dataset.get_fragments():
+            pieces.extend(fragment.split_by_row_group() if hasattr(fragment, "split_by_row_group") else [fragment])
+        rng = np.random.default_rng(seed)
+        for i in rng.permutation(len(pieces)):
+            group = pieces[i].to_table(schema=dataset.schema, columns=columns)
+            group = group.take(pa.array(rng.permutation(len(group))))
+            for start in range(0, len(group), batch_size):
+                yield group.slice(start, batch_size)
+
+    def declared_types(self, table_name: str) -> dict:
+        return {field.name: str(field.type) for field in self.dataset(table_name).schema}
+
+
+def get_connector(contract: dict, server_name: str | None = None):
+    """
+    Connector for a contract's `servers` entry: `server_name` if given, otherwise the first one.
+    SQL databases go through SQLAlchemy, `local`/`parquet`/`csv` servers through pyarrow.dataset.
+    """
+    servers = contract.get("servers") or {}
+    if not servers:
+        raise ValueError("No servers defined in data contract")
+    if server_name is None:
+        server_name = next(iter(servers))
+    if server_name not in servers:
+        raise ValueError(f"Server {server_name} not defined in data contract")
+
+    server = servers[server_name]
+    kind = server.get("type", server_name)
+    if kind == "local" or kind in FILE_FORMATS:
+        return ArrowDatasetConnector.from_server(server)
+    if server.get("uri") or kind in SQL_DRIVERS:
+        return SqlConnector.from_server(server)
+    raise ValueError(f"Unsupported server type: {kind}")
@@ -0,0 +1,105 @@
+import hashlib
+import json
+from pathlib import Path, PurePosixPath
+
+import yaml
+
+# Largest change per column that still counts as "no drift".
+# null_rate and distinct_ratio are absolute differences of fractions; quantile
+# shifts of p01/p99 are relative to the accepted p01..p99 range.
+DEFAULT_TOLERANCES = {
+    "null_rate": 0.05,
+    "distinct_ratio": 0.10,
+    "quantile": 0.10,
+}
+
+# Key of the accepted profile holding the hash of the contract the suite was built from
+CONTRACT_HASH_KEY = "_contract_sha256"
+
+
+def accepted_profile_path(dataset: str, output_path: str) -> str:
+    """Where the profile a suite was built from is committed: next to the suite at `output_path`."""
+    return str(PurePosixPath(Path(output_path).as_posix()).parent / f"{dataset}_profile.json")
+
+
+def load_accepted_profile(dataset: str, output_path: str, repo_name: str, branch: str, gh=None) -> dict | None:
+    """Profile of the last accepted suite on the branch, or None if none was recorded."""
+    from qa_agent.langgraph_src.github_utils import get_default_client, get_file_conditional
+
+    gh = gh or get_default_client()
+    try:
+        content = get_file_conditional(gh, repo_name, accepted_profile_path(dataset, output_path), branch)
+    except Exception as e:
+        print(f"Warning: could not load accepted profile for {dataset}: {e}")
+        return None
+    return json.loads(content) if content else None
+
+
+def load_local_profile(path: str | None) -> dict | None:
+    if path and Path(path).exists():
+        return json.loads(Path(path).read_text())
+    return None
+
+
+def _quantile_shift(current: float, accepted: float, span: float) -> float:
+    scale = span if span > 0 else max(abs(accepted), 1.0)
+    return abs(current - accepted) / scale
+
+
+def contract_hash(contract_text: str) -> str:
+    """Hash of the contract's content, so reformatting or comments do not count as a change."""
+    content = json.dumps(yaml.safe_load(contract_text), sort_keys=True, default=str)
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def with_contract_hash(profile: dict, contract_text: str) -> dict:
+    """The profile to commit as the drift baseline, stamped with the contract it was accepted under."""
+    return {**profile, CONTRACT_HASH_KEY: contract_hash(contract_text)}
+
+
+def contract_changed(accepted: dict, contract_text: str) -> bool:
+    """Whether the contract differs from the accepted one; profiles without a hash count as changed."""
+    return accepted.get(CONTRACT_HASH_KEY) != contract_hash(contract_text)
+
+
+def profile_drift(current: dict, accepted: dict, tolerances: dict | None = None) -> list[dict]:
+    """
+    Differences between two profiles ({table: {null_rate, distinct_ratio, p01, p99}})
+    that exceed the tolerances. Added or removed tables and columns always count.
+    An empty list means the data has not materially changed.
+    """
+    tol = {**DEFAULT_TOLERANCES, **(tolerances or {})}
+    drifts = []
+    current = {t: p for t, p in current.items() if t != CONTRACT_HASH_KEY}
+    accepted = {t: p for t, p in accepted.items() if t != CONTRACT_HASH_KEY}
+
+    for table in sorted(set(current) | set(accepted)):
+        if table not in accepted or table not in current:
+            drifts.append({"table": table, "column": None, "metric": "table",
+                           "accepted": table in accepted, "current": table in current})
+            continue
+        cur, acc = current[table], accepted[table]
+
+        cur_cols, acc_cols = set(cur.get("null_rate", {})), set(acc.get("null_rate", {}))
+        for col in sorted(cur_cols ^ acc_cols):
+            drifts.append({"table": table, "column": col, "metric": "column",
+                           "accepted": col in acc_cols, "current": col in cur_cols})
+
+        for col in sorted(cur_cols & acc_cols):
+            for metric in ("null_rate", "distinct_ratio"):
+                a, c = acc.get(metric, {}).get(col), cur.get(metric, {}).get(col)
+                if a is None or c is None:
+                    continue
+                if abs(c - a) > tol[metric]:
+                    drifts.append({"table": table, "column": col, "metric": metric, "accepted": a, "current": c})
+
+            a01, a99 = acc.get("p01", {}).get(col), acc.get("p99", {}).get(col)
+            span = (a99 - a01) if a01 is not None and a99 is not None else 0.0
+            for metric in ("p01", "p99"):
+                a, c = acc.get(metric, {}).get(col), cur.get(metric, {}).get(col)
+                if a is None and c is None:
+                    continue
+                if a is None or c is None or _quantile_shift(c, a, span) > tol["quantile"]:
+                    drifts.append({"table": table, "column": col, "metric": metric, "accepted": a, "current": c})
+
+    return drifts
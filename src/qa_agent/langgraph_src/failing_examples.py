@@ -0,0 +1,130 @@
+import hashlib
+import json
+import numbers
+import random
+from typing import Iterable
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+ROW_ID_COLUMN = "_row_id"
+
+
+def expectation_key(result: dict) -> str:
+    """
+    Return a stable identifier for an expectation result.
+    Prefers the check_id stored in meta, otherwise falls back to type:column:hash, hashing the
+    type and sorted kwargs: GX does not keep results in suite order, so positions are not stable.
+    """
+    config = result.get("expectation_config") or {}
+    meta = config.get("meta") or {}
+    if meta.get("check_id"):
+        return str(meta["check_id"])
+    # The batch id names the run's own data asset, not the check
+    kwargs = {k: v for k, v in (config.get("kwargs") or {}).items() if k != "batch_id"}
+    column = kwargs.get("column") or ",".join(kwargs.get("column_list") or []) or "table"
+    digest = hashlib.sha256(json.dumps([config.get("type"), kwargs], sort_keys=True, default=str).encode()).hexdigest()
+    return f"{config.get('type')}:{column}:{digest[:12]}"
+
+
+def unexpected_indices(result: dict) -> Iterable:
+    """Yield the unexpected row indices reported by GX, preferring the complete list when present."""
+    payload = result.get("result") or {}
+    indices = payload.get("unexpected_index_list") or payload.get("partial_unexpected_index_list") or []
+    for idx in indices:
+        # Compound/multi-column expectations report dicts or lists instead of plain indices
+        if isinstance(idx, dict):
+            idx = idx.get("index", idx.get(ROW_ID_COLUMN))
+        if isinstance(idx, numbers.Integral) and not isinstance(idx, bool):
+            yield int(idx)
+
+
+class FailingExampleStore:
+    """
+    Keeps a bounded reservoir of deduplicated failing row ids per expectation.
+
+    Rows are only looked up once, for the union of the reservoirs, so the full
+    unexpected set is never materialized.
+    """
+
+    def __init__(self, reservoir_size: int = 20, seed: int = 42):
+        self.reservoir_size = reservoir_size
+        self._rng = random.Random(seed)
+        self._reservoirs: dict[str, list] = {}
+        self._entries: dict[str, dict] = {}
+
+    def add_result(self, result: dict):
+        """Stream the unexpected indices of one expectation result into its reservoir (Algorithm R)."""
+        if result.get("success") is not False:
+            return  # passed, or not evaluated
+        key = expectation_key(result)
+        config = result.get("expectation_config") or {}
+        kwargs = config.get("kwargs") or {}
+        payload = result.get("result") or {}
+
+        reservoir = self._reservoirs.setdefault(key, [])
+        in_reservoir = set(reservoir)
+        seen = 0
+        for idx in unexpected_indices(result):
+            if idx in in_reservoir:
+                continue
+            seen += 1
+            if len(reservoir) < self.reservoir_size:
+                reservoir.append(idx)
+                in_reservoir.add(idx)
+            else:
+                j = self._rng.randrange(seen)
+                if j < self.reservoir_size:
+                    in_reservoir.discard(reservoir[j])
+                    reservoir[j] = idx
+                    in_reservoir.add(idx)
+
+        self._entries[key] = {
+            "type": config.get("type"),
+            "column": kwargs.get("column"),
+            "unexpected_count": payload.get("unexpected_count"),
+        }
+
+    def add_results(self, results: list[dict]):
+        for result in results:
+            self.add_result(result)
+
+    def row_ids(self) -> list:
+        """Sorted union of all reservoirs; every failing row is stored once."""
+        return sorted({idx for reservoir in self._reservoirs.values() for idx in reservoir})
+
+    def index(self) -> dict:
+        return {
+            key: {**entry, "row_ids": sorted(self._reservoirs.get(key, []))}
+            for key, entry in self._entries.items()
+        }
+
+    def write(self, df: pd.DataFrame, parquet_path: str, index_path: str, compression: str = "zstd",
+              lookup=None):
+        """
+        Write the failing rows as compressed parquet and the expectation -> row id index as JSON.
+        `lookup(row_ids)` returns those rows when `df` does not hold every column (defaults to df.iloc).
+        """
+        row_ids = [idx for idx in self.row_ids() if 0 <= idx < len(df)]
+        rows = lookup(row_ids) if lookup is not None else df.iloc[row_ids].copy()
+        rows.insert(0, ROW_ID_COLUMN, row_ids)
+
+        pq.write_table(_to_arrow(rows), parquet_path, compression=compression)
+        with open(index_path, "w") as f:
+            json.dump({"rows": parquet_path, "expectations": self.index()}, f, default=str)
+
+
+def _to_arrow(df: pd.DataFrame) -> pa.Table:
+    """Convert to Arrow, falling back to strings only for columns with mixed types."""
+    arrays = []
+    for col in df.columns:
+        try:
+            arrays.append(pa.array(df[col], from_pandas=True))
+        except (pa.ArrowTypeError, pa.ArrowInvalid, TypeError):
+            arrays.append(pa.array(
+                [None if v is None or v != v else str(v) for v in df[col]],
+                type=pa.string(),
+            ))
+    return pa.table(arrays, names=[str(c) for c in df.columns])
@@ -0,0 +1,226 @@
+import fcntl
+import hashlib
+import json
+import re
+from contextlib import contextmanager
+from datetime import datetime
+from difflib import SequenceMatcher
+from os.path import commonprefix
+from pathlib import Path
+
+from qa_agent.langgraph_src.suite_ast import parse_expectations
+
+FIX_CACHE_PATH = "artifacts/cache/fixes.json"
+# A patch that fails this many times in a row is evicted
+EVICT_AFTER_FAILURES = 2
+MAX_PATCHES_PER_SIGNATURE = 5
+
+_EXCEPTION_RE = re.compile(r"^[\w.]*(Error|Exception|Exit)\b")
+_EXPECTATION_CALL_RE = re.compile(r"\bExpect(?!ation)\w*\s*\(")
+_NORMALIZE = (
+    (re.compile(r"0x[0-9a-fA-F]+"), "0x?"),
+    (re.compile(r"(?:[A-Za-z]:)?(?:[\\/][\w.\-]+)+"), "<path>"),
+    (re.compile(r"\b\d+(\.\d+)?\b"), "N"),
+)
+
+
+def error_signature(stderr: str) -> str | None:
+    """
+    Normalized text of the error a traceback ends with: the last exception line and what
+    follows it (e.g. pydantic's field errors), without paths, addresses or numbers.
+    """
+    lines = [line.strip() for line in stderr.strip().splitlines() if line.strip()]
+    if not lines:
+        return None
+    start = max((i for i, line in enumerate(lines) if _EXCEPTION_RE.match(line)), default=len(lines) - 1)
+    text = " | ".join(lines[start:])
+    for pattern, replacement in _NORMALIZE:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+def _is_word(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+def _fragment_edit(old: str, new: str) -> dict:
+    """
+    The changed part of a line, widened to whole identifiers plus one neighbouring character,
+    e.g. " mostly_=" -> " mostly=". The edit is anchored on the whole original line, so it
+    applies to other suites containing that line and leaves lines that merely share the fragment alone.
+    """
+    prefix = len(commonprefix([old, new]))
+    suffix = len(commonprefix([old[prefix:][::-1], new[prefix:][::-1]]))
+    start = prefix
+    while start > 0 and _is_word(old[start - 1]):
+        start -= 1
+    start = max(start - 1, 0)
+    end = len(old) - suffix
+    while end < len(old) and _is_word(old[end]):
+        end += 1
+    end = min(end + 1, len(old))
+    fragment = old[start:end]
+    if not fragment.strip():
+        return {"kind": "block", "before": None, "old": [old], "new": [new]}
+    return {"kind": "fragment", "line": old.strip(), "old": fragment, "new": new[start:len(new) - (len(old) - end)]}
+
+
+def derive_edits(broken: str, fixed: str) -> list[dict]:
+    """Edits that turn `broken` into `fixed`: in-line fragments where lines were rewritten, line blocks otherwise."""
+    a, b = broken.splitlines(), fixed.splitlines()
+    edits = []
+    for tag, i1, i2, j1, j2 in SequenceMatcher(None, a, b, autojunk=False).get_opcodes():
+        if tag == "equal":
+            continue
+        if tag == "replace" and i2 - i1 == j2 - j1:
+            edits.extend(_fragment_edit(old, new) for old, new in zip(a[i1:i2], b[j1:j2]))
+        else:
+            # Insertions are anchored on the line before them
+            edits.append({"kind": "block", "before": a[i1 - 1] if i1 else None, "old": a[i1:i2], "new": b[j1:j2]})
+    return edits
+
+
+def _find_block(lines: list[str], block: list[str]) -> int | None:
+    wanted = [line.strip() for line in block]
+    for i in range(len(lines) - len(wanted) + 1):
+        if [line.strip() for line in lines[i:i + len(wanted)]] == wanted:
+            return i
+    return None
+
+
+def apply_edits(code: str, edits: list[dict]) -> str | None:
+    """`code` with every edit applied, or None when one of them does not apply or nothing changes."""
+    patched = code
+    for edit in edits:
+        lines = patched.splitlines()
+        if edit["kind"] == "fragment":
+            # The first line still equal to the original one; a repeated line has one edit per occurrence
+            at = next((i for i, line in enumerate(lines)
+                       if line.strip() == edit.get("line") and edit["old"] in line), None)
+            if at is None:
+                return None
+            lines[at] = lines[at].replace(edit["old"], edit["new"], 1)
+            patched = "\n".join(lines) + ("\n" if patched.endswith("\n") else "")
+            continue
+        anchor = [edit["before"]] if edit["before"] is not None else []
+        if not anchor and not edit["old"]:
+            at = 0
+        else:
+            at = _find_block(lines, anchor + edit["old"])
+            if at is None:
+                return None
+        at += len(anchor)
+        lines[at:at + len(edit["old"])] = edit["new"]
+        patched = "\n".join(lines) + ("\n" if patched.endswith("\n") else "")
+    return patched if patched != code else None
+
+
+def expectation_count(code: str) -> int:
+    """Expectations `code` constructs; counted textually when it does not parse (e.g. a SyntaxError being fixed)."""
+    parsed = parse_expectations(code)
+    return len(parsed.expectations) if parsed is not None else len(_EXPECTATION_CALL_RE.findall(code))
+
+
+class FixCache:
+    """
+    Repairs learned from earlier runs, keyed by error signature.
+
+    When a model fix makes a failing suite run, the edits between the broken and the
+    fixed code are stored under the signature of the error. Later runs hitting the same
+    error try those edits before asking the model; patches that keep failing are evicted.
+    The cache is a JSON file shared by concurrent runs through a file lock.
+    """
+
+    def __init__(self, path: str = FIX_CACHE_PATH):
+        self.path = Path(path)
+
+    @contextmanager
+    def _locked(self, write: bool = False):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path.with_suffix(".lock"), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                data = json.loads(self.path.read_text()) if self.path.exists() else {}
+                data.setdefault("signatures", {})
+                data.setdefault("stats", {"lookups": 0, "hits": 0, "misses": 0, "learned": 0, "evicted": 0})
+                yield data
+                if write:
+                    tmp_path = self.path.with_suffix(".tmp")
+                    tmp_path.write_text(json.dumps(data, indent=1))
+                    tmp_path.replace(self.path)
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def candidates(self, code: str, stderr: str) -> list[tuple[str, str, str]]:
+        """(signature, patch id, patched code) for the cached patches that apply to `code`, most successful first."""
+        signature = error_signature(stderr)
+        if signature is None:
+            return []
+        with self._locked(write=True) as data:
+            data["stats"]["lookups"] += 1
+            patches = data["signatures"].get(signature, [])
+            found = []
+            for patch in sorted(patches, key=lambda p: -p["hits"]):
+                patched = apply_edits(code, patch["edits"])
+                if patched is not None:
+                    found.append((signature, patch["id"], patched))
+            if not found:
+                data["stats"]["misses"] += 1
+        return found
+
+    def record(self, signature: str, patch_id: str, success: bool):
+        """Outcome of a cached patch; evicts it after EVICT_AFTER_FAILURES failures in a row."""
+        with self._locked(write=True) as data:
+            patches = data["signatures"].get(signature, [])
+            patch = next((p for p in patches if p["id"] == patch_id), None)
+            if patch is None:
+                return  # evicted meanwhile by another run
+            patch["last_used"] = datetime.now().isoformat(timespec="seconds")
+            if success:
+                patch["hits"] += 1
+                patch["failures"] = 0
+                data["stats"]["hits"] += 1
+                return
+            patch["failures"] += 1
+            if patch["failures"] >= EVICT_AFTER_FAILURES:
+                patches.remove(patch)
+                data["stats"]["evicted"] += 1
+                if not patches:
+                    data["signatures"].pop(signature)
+
+    def learn(self, stderr: str, broken: str, fixed: str) -> bool:
+        """Store the edits that fixed the error in `stderr`. Returns whether a new patch was added."""
+        signature = error_signature(stderr)
+        edits = derive_edits(broken, fixed)
+        if signature is None or not edits:
+            return False
+        with self._locked(write=True) as data:
+            patches = data["signatures"].setdefault(signature, [])
+            patch_id = hashlib.sha1(json.dumps(edits, sort_keys=True).encode()).hexdigest()[:12]
+            if any(p["id"] == patch_id for p in patches):
+                return False
+            patches.append({"id": patch_id, "edits": edits, "hits": 0, "failures": 0,
+                            "last_used": datetime.now().isoformat(timespec="seconds")})
+            # Keep the most successful, most recently used patches per signature
+            patches.sort(key=lambda p: (p["hits"], p["last_used"]), reverse=True)
+            data["stats"]["evicted"] += len(patches[MAX_PATCHES_PER_SIGNATURE:])
+            del patches[MAX_PATCHES_PER_SIGNATURE:]
+            data["stats"]["learned"] += 1
+        return True
+
+    def evict(self, signature: str | None = None) -> int:
+        """Drop the patches of one signature, or all of them. Returns the number of patches removed."""
+        with self._locked(write=True) as data:
+            signatures = data["signatures"]
+            dropped = [signature] if signature is not None else list(signatures)
+            removed = sum(len(signatures.pop(s, [])) for s in dropped)
+            data["stats"]["evicted"] += removed
+        return removed
+
+    def stats(self) -> dict:
+        with self._locked() as data:
+            stats = dict(data["stats"])
+            stats["signatures"] = len(data["signatures"])
+            stats["patches"] = sum(len(p) for p in data["signatures"].values())
+        stats["hit_rate"] = round(stats["hits"] / stats["lookups"], 3) if stats["lookups"] else None
+        return stats
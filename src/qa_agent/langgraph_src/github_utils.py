@@ -1,26 +1,100 @@
+import json
+import threading
+from base64 import b64decode, b64encode
+from hashlib import sha1
+from os import getenv
 from pathlib import Path
-from typing import Dict, Optional
-from github import Github, Auth, GithubException
+from typing import Dict, Optional, Union
+from github import Github, Auth, GithubException, InputGitTreeElement
+
+CACHE_DIR = "artifacts/cache/github"
 
 # -----------------------------
 # Auth & Initialization
 # -----------------------------
 
+_clients: Dict[tuple, Github] = {}
+_clients_lock = threading.Lock()
+
+
 def get_github_client(app_id: str, installation_id: int, private_key_path: str) -> Github:
     """
     Initializes the Github client using App Authentication.
     The SDK handles JWT signing and installation token retrieval.
+
+    Clients are cached per installation: the private key is read once, the
+    installation token is reused until it nears expiry, and the underlying
+    HTTP session keeps its connections alive across calls.
+    """
+    key = ("app", str(app_id), int(installation_id), str(private_key_path))
+    with _clients_lock:
+        if key not in _clients:
+            private_key = Path(private_key_path).read_text()
+
+            # 1. Create Auth object for the App
+            auth = Auth.AppAuth(app_id, private_key)
+
+            # 2. Scope the auth to the specific installation
+            installation_auth = auth.get_installation_auth(installation_id)
+
+            # 3. Cache the authenticated client
+            _clients[key] = Github(auth=installation_auth)
+        return _clients[key]
+
+
+def get_token_client(token: str) -> Github:
+    """Cached client authenticated with a personal access token."""
+    key = ("token", token)
+    with _clients_lock:
+        if key not in _clients:
+            _clients[key] = Github(auth=Auth.Token(token))
+        return _clients[key]
+
+
+def get_default_client() -> Github:
     """
-    private_key = Path(private_key_path).read_text()
-    
-    # 1. Create Auth object for the App
-    auth = Auth.AppAuth(app_id, private_key)
-    
-    # 2. Scope the auth to the specific installation
-    installation_auth = auth.get_installation_auth(installation_id)
-    
-    # 3. Return the authenticated client
-    return Github(auth=installation_auth)
+    Shared client built from the environment. Prefers the GitHub App credentials
+    and falls back to GITHUB_TOKEN.
+    """
+    if getenv("GITHUB_APP_ID"):
+        return get_github_client(
+            getenv("GITHUB_APP_ID"),
+            int(getenv("GITHUB_INSTALLATION_ID")),
+            getenv("GITHUB_PRIVATE_KEY_PATH"),
+        )
+    token = getenv("GITHUB_TOKEN")
+    if not token:
+        raise RuntimeError("Missing GITHUB_APP_ID or GITHUB_TOKEN environment variable")
+    return get_token_client(token)
+
+
+def get_file_conditional(gh: Github, repo_name: str, filepath: str, branch: str, cache_dir: str = CACHE_DIR) -> Optional[str]:
+    """
+    Fetch a file's text through the Contents API with If-None-Match.
+    Unchanged files are answered with a 304 (which does not count against the
+    rate limit) and served from the local cache. Returns None if the file does not exist.
+    """
+    cache_path = Path(cache_dir) / (sha1(f"{repo_name}:{branch}:{filepath}".encode()).hexdigest() + ".json")
+    cached = json.loads(cache_path.read_text()) if cache_path.exists() else None
+
+    headers = {"If-None-Match": cached["etag"]} if cached else {}
+    status, response_headers, body = gh.requester.requestJson(
+        "GET", f"/repos/{repo_name}/contents/{filepath}", parameters={"ref": branch}, headers=headers
+    )
+    if status == 304 and cached:
+        return cached["content"]
+    if status == 404:
+        cache_path.unlink(missing_ok=True)
+        return None
+    if status != 200:
+        raise GithubException(status, body, response_headers)
+
+    content = b64decode(json.loads(body)["content"]).decode("utf-8")
+    etag = {k.lower(): v for k, v in response_headers.items()}.get("etag")
+    if etag:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        cache_path.write_text(json.dumps({"etag": etag, "content": content}))
+    return content
 
 
 # -----------------------------
@@ -38,9 +112,50 @@ def create_branch(repo, new_branch: str, base_branch: str):
             raise
 
 
-def commit_files(repo, branch: str, files: Dict[str, str], commit_message: str):
+def commit_files(
+    repo,
+    branch: str,
+    files: Dict[str, Union[str, bytes]],
+    commit_message: str,
+    batched: bool = True,
+):
+    """
+    Commit/update files on a branch. By default all files land in a single commit
+    through the Git Data API; the per-file Contents API path is used as a fallback.
+    """
+    if batched:
+        try:
+            return commit_files_batched(repo, branch, files, commit_message)
+        except GithubException as e:
+            print(f"Warning: batched commit failed ({e.status}), falling back to per-file commits")
+    return commit_files_per_file(repo, branch, files, commit_message)
+
+
+def commit_files_batched(repo, branch: str, files: Dict[str, Union[str, bytes]], commit_message: str):
+    """
+    Write any number of files in one commit: one tree, one commit and one ref update.
+    Text files are inlined in the tree; only binary files need a separate blob upload.
+    """
+    ref = repo.get_git_ref(f"heads/{branch}")
+    parent = repo.get_git_commit(ref.object.sha)
+
+    elements = []
+    for path, content in files.items():
+        if isinstance(content, bytes):
+            blob = repo.create_git_blob(b64encode(content).decode("ascii"), "base64")
+            elements.append(InputGitTreeElement(path=path, mode="100644", type="blob", sha=blob.sha))
+        else:
+            elements.append(InputGitTreeElement(path=path, mode="100644", type="blob", content=content))
+
+    tree = repo.create_git_tree(elements, base_tree=parent.tree)
+    commit = repo.create_git_commit(commit_message, tree, [parent])
+    ref.edit(sha=commit.sha)
+    return commit
+
+
+def commit_files_per_file(repo, branch: str, files: Dict[str, Union[str, bytes]], commit_message: str):
     """
-    Commit/update files. The SDK handles checking for existing SHAs 
+    Commit/update files one by one. The SDK handles checking for existing SHAs 
     and base64 encoding automatically.
     """
     for path, content in files.items():
@@ -79,6 +194,10 @@ def create_pull_request(
     body: Optional[str] = None,
     draft: bool = True,
 ):
+    """Open a PR from `head`, or return the open one a previous attempt (e.g. a resumed run) created."""
+    existing = repo.get_pulls(state="open", head=f"{repo.owner.login}:{head}", base=base)
+    if existing.totalCount:
+        return existing[0]
     return repo.create_pull(
         title=title,
         body=body or "",
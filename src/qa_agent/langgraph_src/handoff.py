@@ -0,0 +1,25 @@
+import threading
+
+import pyarrow as pa
+
+_tables: dict = {}
+_lock = threading.Lock()
+
+
+def put(run_id: str, dataset: str, table_name: str, table: pa.Table):
+    """Keep a run's sampled table in memory for the later stages of the same process."""
+    with _lock:
+        _tables[(run_id, dataset, table_name)] = table
+
+
+def get(run_id: str, dataset: str, table_name: str) -> pa.Table | None:
+    """The sampled table if this process sampled it, otherwise None (read the parquet sample instead)."""
+    with _lock:
+        return _tables.get((run_id, dataset, table_name))
+
+
+def release(run_id: str):
+    """Drop a run's tables once nothing in the process needs them anymore."""
+    with _lock:
+        for key in [k for k in _tables if k[0] == run_id]:
+            del _tables[key]
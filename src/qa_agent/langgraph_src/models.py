@@ -0,0 +1,58 @@
+import threading
+from os import getenv
+
+# Role -> (environment variable, default model)
+MODEL_ROLES = {
+    "coder": ("CODER_MODEL", "gpt-5.2"),
+    "writer": ("WRITER_MODEL", "gpt-3.5-turbo"),
+    # First tier of the cascade (langgraph_src/cascade.py) for tasks with a cheap acceptance check
+    "fast": ("FAST_MODEL", "gpt-5-mini"),
+    # Optional first tier for the writer, whose default model is already a cheap one
+    "writer_fast": ("WRITER_FAST_MODEL", None),
+}
+
+# Set QA_AGENT_LLM_CASSETTE (and QA_AGENT_LLM_MODE=record|replay) to wrap every role
+# in a ReplayChatModel, e.g. for offline benchmarks.
+CASSETTE_ENV, CASSETTE_MODE_ENV = "QA_AGENT_LLM_CASSETTE", "QA_AGENT_LLM_MODE"
+
+_models: dict = {}
+_models_lock = threading.Lock()
+
+
+def model_name(role: str) -> str | None:
+    env_var, default = MODEL_ROLES[role]
+    return getenv(env_var, default)
+
+
+def get_model(role: str):
+    """
+    Chat model for a role, created on first use and shared by every run in the process.
+    langchain is only imported when a model is actually needed.
+    """
+    with _models_lock:
+        if role not in _models:
+            from langchain.chat_models import init_chat_model
+
+            env_var, default = MODEL_ROLES[role]
+            cassette = getenv(CASSETTE_ENV)
+            mode = getenv(CASSETTE_MODE_ENV, "replay")
+            if cassette:
+                from qa_agent.langgraph_src.replay import ReplayChatModel
+
+                inner = init_chat_model(model=getenv(env_var, default)) if mode == "record" else None
+                _models[role] = ReplayChatModel(cassette_path=cassette, role=role, mode=mode, inner=inner)
+            else:
+                _models[role] = init_chat_model(model=getenv(env_var, default))
+        return _models[role]
+
+
+def reset_models():
+    """Drop the cached models, e.g. after changing the cassette environment variables."""
+    with _models_lock:
+        _models.clear()
+
+
+def model_stats() -> dict:
+    """Call, token and latency counters per role for models that keep them (replay models)."""
+    with _models_lock:
+        return {role: m.stats for role, m in _models.items() if hasattr(m, "stats")}
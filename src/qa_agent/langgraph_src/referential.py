@@ -0,0 +1,178 @@
+import re
+from dataclasses import dataclass
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from qa_agent.langgraph_src.spill import SpillPartitions
+
+# Distinct parent keys held in memory before the key set is partitioned to disk
+MAX_IN_MEMORY_KEYS = 5_000_000
+ORPHAN_SAMPLE_SIZE = 20
+RESULT_TYPE = "expect_column_values_to_exist_in_parent"
+
+_DESCRIPTION_RE = re.compile(r"\breference to (\w+)\.(\w+)", re.I)
+
+
+@dataclass(frozen=True)
+class ForeignKey:
+    table: str
+    column: str
+    parent_table: str
+    parent_column: str
+
+    @property
+    def check_id(self) -> str:
+        return f"{self.table}:foreign_key:{self.column}"
+
+
+def _split_reference(reference: str) -> tuple[str, str] | None:
+    parts = str(reference).rsplit(".", 1)
+    return (parts[0], parts[1]) if len(parts) == 2 and all(parts) else None
+
+
+def foreign_keys(contract: dict) -> list[ForeignKey]:
+    """
+    Foreign keys declared in a contract, from model-level
+    `quality: [{rule: referential_integrity, field, references: "table.column"}]`,
+    field-level `references: "table.column"`, or descriptions like "Reference to table.column".
+    """
+    models = contract.get("models") or contract.get("schema") or {}
+    if isinstance(models, list):
+        models = {m["name"]: m for m in models}
+
+    keys = []
+    for table, model in models.items():
+        model = model or {}
+        for rule in model.get("quality") or []:
+            if rule.get("rule") == "referential_integrity" and rule.get("field") and rule.get("references"):
+                parent = _split_reference(rule["references"])
+                if parent:
+                    keys.append(ForeignKey(table, rule["field"], *parent))
+
+        fields = model.get("fields") or model.get("properties") or {}
+        if isinstance(fields, list):
+            fields = {f.get("name"): f for f in fields}
+        for column, field in fields.items():
+            field = field or {}
+            parent = _split_reference(field["references"]) if field.get("references") else None
+            if parent is None:
+                match = _DESCRIPTION_RE.search(str(field.get("description") or ""))
+                parent = match.groups() if match else None
+            if parent:
+                keys.append(ForeignKey(table, column, *parent))
+
+    # The same relationship may be declared in several places
+    return list(dict.fromkeys(keys))
+
+
+def _unique(chunks: list) -> pa.Array:
+    return pc.unique(pa.chunked_array(chunks).combine_chunks()) if chunks else pa.array([])
+
+
+def find_orphans(parent_batches, child_keys: pa.Array, max_in_memory: int = MAX_IN_MEMORY_KEYS) -> pa.Array:
+    """
+    Child key values (nulls excluded) that have no parent. Parent keys arrive as a stream
+    of single-column tables and are reduced to a hash set; past `max_in_memory` distinct
+    keys, parents and children are hash-partitioned to disk and probed partition by partition.
+    """
+    child_keys = child_keys.drop_null()
+    chunks, held, spill, parent_type = [], 0, None, None
+    try:
+        for batch in parent_batches:
+            keys = pc.unique(batch.column(0).combine_chunks())
+            parent_type = keys.type
+            if spill is not None:
+                spill.add(pa.table({"key": keys}))
+                continue
+            chunks.append(keys)
+            held += len(keys)
+            if held > max_in_memory:
+                merged = _unique(chunks)
+                chunks, held = [merged], len(merged)
+                if held > max_in_memory:
+                    spill = SpillPartitions(["key"])
+                    spill.add(pa.table({"key": merged}))
+                    chunks = []
+
+        if parent_type is not None and child_keys.type != parent_type:
+            # Partitioning and membership both compare values of one type
+            child_keys = child_keys.cast(parent_type, safe=False)
+
+        if spill is None:
+            return child_keys.filter(pc.invert(pc.is_in(child_keys, value_set=_unique(chunks))))
+
+        spill.close()
+        orphans = [child_keys[:0]]
+        with SpillPartitions(["key"], num_partitions=spill.num_partitions) as children:
+            children.add(pa.table({"key": child_keys}))
+            for partition, child_part in children.partitions():
+                probe = child_part.column("key").combine_chunks()
+                parent_part = spill.read(partition)
+                if parent_part is None:
+                    orphans.append(probe)
+                    continue
+                parents = pc.unique(parent_part.column("key").combine_chunks())
+                orphans.append(probe.filter(pc.invert(pc.is_in(probe, value_set=parents))))
+        return pa.chunked_array(orphans, type=child_keys.type).combine_chunks()
+    finally:
+        if spill is not None:
+            spill.cleanup()
+
+
+def result_entry(fk: ForeignKey, checked: int, orphans: pa.Array | None, error: str | None = None) -> dict:
+    """
+    A validation result shaped like GX's, so reports, history and PR bodies pick it up.
+    A key that could not be checked (e.g. the source is unreachable) has `success: None`: not evaluated, not failed.
+    """
+    orphan_count = len(orphans) if orphans is not None else None
+    payload = {"element_count": checked}
+    if orphans is not None:
+        payload.update({
+            "unexpected_count": orphan_count,
+            "unexpected_percent": 100.0 * orphan_count / checked if checked else 0.0,
+            "partial_unexpected_list": pc.unique(orphans)[:ORPHAN_SAMPLE_SIZE].to_pylist(),
+        })
+    return {
+        "success": None if error is not None else orphan_count == 0,
+        "expectation_config": {
+            "type": RESULT_TYPE,
+            "kwargs": {"column": fk.column, "table": fk.table,
+                       "parent_table": fk.parent_table, "parent_column": fk.parent_column},
+            "meta": {"check_id": fk.check_id},
+        },
+        "result": payload,
+        "exception_info": {"raised_exception": error is not None, "exception_message": error},
+    }
+
+
+def check_referential_integrity(contract: dict, child_samples: dict, connector=None) -> list[dict]:
+    """
+    Check every foreign key of the contract: the child values come from the run's samples
+    ({table: Arrow table, or path to its parquet sample}), the parent keys are streamed from the source.
+    Returns one result entry per foreign key.
+    """
+    keys = foreign_keys(contract)
+    if not keys:
+        return []
+    if connector is None:
+        from qa_agent.langgraph_src.connectors import get_connector
+        connector = get_connector(contract)
+
+    results = []
+    for fk in keys:
+        sample = child_samples.get(fk.table)
+        try:
+            in_memory = isinstance(sample, pa.Table)
+            if sample is None or fk.column not in (sample.column_names if in_memory else pq.read_schema(sample).names):
+                raise ValueError(f"{fk.table}.{fk.column} is not in the samples")
+            child = sample if in_memory else pq.read_table(sample, columns=[fk.column])
+            child = child.column(fk.column).combine_chunks()
+            parents = connector.iter_batches(fk.parent_table, [fk.parent_column])
+            orphans = find_orphans(parents, child)
+            results.append(result_entry(fk, len(child.drop_null()), orphans))
+        except Exception as e:
+            print(f"Warning: could not check {fk.table}.{fk.column} -> {fk.parent_table}.{fk.parent_column}: {e}")
+            results.append(result_entry(fk, 0, None, f"{type(e).__name__}: {e}"))
+    return results
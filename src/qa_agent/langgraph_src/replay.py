@@ -0,0 +1,144 @@
+import hashlib
+import json
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import BaseMessage, message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import ConfigDict, PrivateAttr
+
+
+# Directories of absolute paths, e.g. in tracebacks quoted by repair prompts.
+ABSOLUTE_DIRS = re.compile(r"(?<![\w.:/])/(?:[\w.\-]+/)+")
+
+
+def normalize_content(content: Any) -> Any:
+    """Strip the directories of absolute paths so cassettes replay from another checkout or workdir."""
+    if isinstance(content, str):
+        return ABSOLUTE_DIRS.sub("<dir>/", content)
+    if isinstance(content, list):
+        return [normalize_content(c) for c in content]
+    if isinstance(content, dict):
+        return {k: normalize_content(v) for k, v in content.items()}
+    return content
+
+
+def prompt_key(role: str, messages: list[BaseMessage], tools: Optional[list] = None) -> str:
+    """Stable hash of a model call: the role, every message's type/content/tool calls and the bound tools."""
+    payload = {
+        "role": role,
+        "messages": [
+            {"type": m.type, "content": normalize_content(m.content),
+             "tool_calls": getattr(m, "tool_calls", None) or None}
+            for m in messages
+        ],
+        "tools": sorted(t["function"]["name"] for t in tools or []),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class ReplayChatModel(BaseChatModel):
+    """
+    Chat model that records real responses to a JSONL cassette and replays them offline.
+
+    In "record" mode every call goes to `inner` and the response, its latency and its
+    token usage are appended to the cassette. In "replay" mode the recorded response
+    is returned after sleeping for the recorded latency (unless `simulate_latency` is
+    off), so the pipeline can be timed without paying for model calls. Repeated
+    identical prompts are replayed in the order they were recorded.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    cassette_path: str
+    role: str
+    mode: str = "replay"
+    inner: Optional[BaseChatModel] = None
+    simulate_latency: bool = True
+
+    _entries: dict = PrivateAttr(default_factory=dict)
+    _cursor: dict = PrivateAttr(default_factory=dict)
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+    _stats: dict = PrivateAttr(default_factory=lambda: {
+        "calls": 0, "input_tokens": 0, "output_tokens": 0, "latency_seconds": 0.0,
+    })
+
+    def model_post_init(self, __context: Any) -> None:
+        if self.mode not in ("record", "replay"):
+            raise ValueError(f"Unknown replay mode: {self.mode}")
+        if self.mode == "record" and self.inner is None:
+            raise ValueError("Record mode needs the real model as `inner`")
+        path = Path(self.cassette_path)
+        if path.exists():
+            for line in path.read_text().splitlines():
+                if line.strip():
+                    entry = json.loads(line)
+                    self._entries.setdefault(entry["key"], []).append(entry)
+
+    @property
+    def _llm_type(self) -> str:
+        return "replay"
+
+    @property
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats)
+
+    def bind_tools(self, tools, *, tool_choice=None, **kwargs):
+        formatted = [convert_to_openai_tool(t) for t in tools]
+        if tool_choice is not None:
+            kwargs["tool_choice"] = tool_choice
+        return self.bind(tools=formatted, **kwargs)
+
+    def _generate(self, messages: list[BaseMessage], stop=None, run_manager=None, **kwargs) -> ChatResult:
+        key = prompt_key(self.role, messages, kwargs.get("tools"))
+        if self.mode == "record":
+            entry = self._record(key, messages, stop, **kwargs)
+        else:
+            entry = self._replay(key)
+            if self.simulate_latency:
+                time.sleep(entry["latency_seconds"])
+
+        message = messages_from_dict([entry["message"]])[0]
+        usage = entry.get("usage") or {}
+        with self._lock:
+            self._stats["calls"] += 1
+            self._stats["input_tokens"] += usage.get("input_tokens", 0)
+            self._stats["output_tokens"] += usage.get("output_tokens", 0)
+            self._stats["latency_seconds"] += entry["latency_seconds"]
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _record(self, key: str, messages: list[BaseMessage], stop, **kwargs) -> dict:
+        started = time.perf_counter()
+        result = self.inner._generate(messages, stop=stop, **kwargs)
+        latency = time.perf_counter() - started
+
+        message = result.generations[0].message
+        entry = {
+            "key": key,
+            "role": self.role,
+            "latency_seconds": round(latency, 4),
+            "usage": dict(getattr(message, "usage_metadata", None) or {}),
+            "message": message_to_dict(message),
+        }
+        with self._lock:
+            self._entries.setdefault(key, []).append(entry)
+            Path(self.cassette_path).parent.mkdir(parents=True, exist_ok=True)
+            with open(self.cassette_path, "a") as f:
+                f.write(json.dumps(entry, default=str) + "\n")
+        return entry
+
+    def _replay(self, key: str) -> dict:
+        with self._lock:
+            recorded = self._entries.get(key)
+            if not recorded:
+                raise KeyError(f"No recorded {self.role} response for prompt {key[:12]} in {self.cassette_path}")
+            position = self._cursor.get(key, 0)
+            # Past the last recording, keep returning the final response
+            self._cursor[key] = position + 1
+            return recorded[min(position, len(recorded) - 1)]
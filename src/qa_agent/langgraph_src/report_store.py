@@ -0,0 +1,177 @@
+import fcntl
+import json
+from datetime import datetime
+from pathlib import Path
+
+from qa_agent.langgraph_src.failing_examples import expectation_key
+
+
+REPORTS_ROOT = "artifacts/reports"
+
+
+def _paths(dataset: str, root: str) -> tuple[Path, Path]:
+    base = Path(root)
+    return base / f"{dataset}.ndjson", base / f"{dataset}.index.json"
+
+
+def _load_index(index_path: Path) -> dict:
+    if not index_path.exists() or index_path.stat().st_size == 0:
+        return {"runs": {}}
+    with open(index_path) as f:
+        return json.load(f)
+
+
+def report_rows(report: dict, dataset: str, run_id: str) -> list[dict]:
+    """Flatten a GX validation report into one row per expectation."""
+    rows = []
+    for result in report.get("results", []):
+        config = result.get("expectation_config") or {}
+        kwargs = config.get("kwargs") or {}
+        payload = result.get("result") or {}
+        rows.append({
+            "dataset": dataset,
+            "run_id": run_id,
+            "expectation": expectation_key(result),
+            "type": config.get("type"),
+            "column": kwargs.get("column"),
+            # None: the check could not be evaluated in this run
+            "success": None if result.get("success") is None else bool(result["success"]),
+            "element_count": payload.get("element_count"),
+            "unexpected_count": payload.get("unexpected_count"),
+            "unexpected_percent": payload.get("unexpected_percent"),
+            "observed_value": payload.get("observed_value"),
+        })
+    return rows
+
+
+def _drop_range(data_path: Path, index: dict, run_id: str):
+    """Cut an already recorded run out of the ndjson file and shift the byte ranges after it."""
+    entry = index["runs"].pop(run_id)
+    data = data_path.read_bytes()
+    data_path.write_bytes(data[:entry["offset"]] + data[entry["offset"] + entry["length"]:])
+    for other in index["runs"].values():
+        if other["offset"] > entry["offset"]:
+            other["offset"] -= entry["length"]
+
+
+def append_run(report: dict, dataset: str, run_id: str, root: str = REPORTS_ROOT) -> int:
+    """
+    Append the per-expectation rows of one run to the dataset's ndjson file
+    and record its byte range in the index. Returns the number of rows written.
+    Recording a run_id again (e.g. a validation-only re-run) replaces its rows and
+    makes it the latest run.
+    """
+    data_path, index_path = _paths(dataset, root)
+    data_path.parent.mkdir(parents=True, exist_ok=True)
+
+    rows = report_rows(report, dataset, run_id)
+    payload = "".join(
+        json.dumps(row, separators=(",", ":"), default=str) + "\n" for row in rows
+    ).encode("utf-8")
+
+    # Concurrent runs on the same dataset append one at a time
+    with open(data_path.with_suffix(".lock"), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            index = _load_index(index_path)
+            if run_id in index["runs"]:
+                _drop_range(data_path, index, run_id)
+
+            with open(data_path, "ab") as f:
+                offset = f.tell()
+                f.write(payload)
+
+            index["runs"][run_id] = {
+                "offset": offset,
+                "length": len(payload),
+                "rows": len(rows),
+                "success": bool(report.get("success")),
+                "recorded_at": datetime.now().isoformat(timespec="seconds"),
+            }
+            tmp_path = index_path.with_suffix(".tmp")
+            with open(tmp_path, "w") as f:
+                json.dump(index, f, separators=(",", ":"))
+            tmp_path.replace(index_path)
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+    return len(rows)
+
+
+def list_runs(dataset: str, root: str = REPORTS_ROOT) -> list[str]:
+    """Run ids of a dataset in the order they were recorded."""
+    _, index_path = _paths(dataset, root)
+    return list(_load_index(index_path)["runs"].keys())
+
+
+def _read_rows(f, entry: dict) -> list[dict]:
+    f.seek(entry["offset"])
+    chunk = f.read(entry["length"])
+    return [json.loads(line) for line in chunk.decode("utf-8").splitlines() if line]
+
+
+def load_run(dataset: str, run_id: str, root: str = REPORTS_ROOT) -> list[dict]:
+    """Read the rows of a single run by seeking straight to its byte range."""
+    data_path, index_path = _paths(dataset, root)
+    entry = _load_index(index_path)["runs"].get(run_id)
+    if entry is None:
+        raise KeyError(f"Run {run_id} not found for dataset {dataset}")
+    with open(data_path, "rb") as f:
+        return _read_rows(f, entry)
+
+
+def pass_rate(dataset: str, expectation: str, last_n: int = 10, root: str = REPORTS_ROOT) -> dict:
+    """
+    Pass rate of one expectation over the last N recorded runs.
+    Runs in which the expectation did not appear or was not evaluated are not counted.
+    """
+    data_path, index_path = _paths(dataset, root)
+    # One index read and one open file; each run is a seek to its byte range
+    runs = list(_load_index(index_path)["runs"].items())[-last_n:]
+    outcomes = []
+    if runs:
+        with open(data_path, "rb") as f:
+            for run_id, entry in runs:
+                for row in _read_rows(f, entry):
+                    if row["expectation"] == expectation and row["success"] is not None:
+                        outcomes.append({"run_id": run_id, "success": row["success"]})
+                        break
+
+    passed = sum(1 for o in outcomes if o["success"])
+    return {
+        "expectation": expectation,
+        "runs": len(outcomes),
+        "passed": passed,
+        "pass_rate": passed / len(outcomes) if outcomes else None,
+        "history": outcomes,
+    }
+
+
+def _unexpected_count(row: dict) -> int | None:
+    # Passing expectations are validated with BOOLEAN_ONLY and carry no count; they had no unexpected rows
+    if row["success"] and row["unexpected_count"] is None:
+        return 0
+    return row["unexpected_count"]
+
+
+def diff_runs(dataset: str, run_a: str, run_b: str, root: str = REPORTS_ROOT) -> dict:
+    """What changed between two runs: added/removed expectations and flipped or shifted results."""
+    rows_a = {row["expectation"]: row for row in load_run(dataset, run_a, root)}
+    rows_b = {row["expectation"]: row for row in load_run(dataset, run_b, root)}
+
+    changed = []
+    for key in rows_a.keys() & rows_b.keys():
+        before, after = rows_a[key], rows_b[key]
+        counts = [_unexpected_count(before), _unexpected_count(after)]
+        if (before["success"], counts[0]) != (after["success"], counts[1]):
+            changed.append({
+                "expectation": key,
+                "success": [before["success"], after["success"]],
+                "unexpected_count": counts,
+            })
+
+    return {
+        "added": sorted(rows_b.keys() - rows_a.keys()),
+        "removed": sorted(rows_a.keys() - rows_b.keys()),
+        "changed": sorted(changed, key=lambda c: c["expectation"]),
+    }
@@ -1,21 +1,33 @@
 from datetime import datetime
 import json
 import yaml
-import sqlalchemy
 import pyarrow as pa
 import pyarrow.parquet as pq
 import numpy as np
 
+from qa_agent.langgraph_src import handoff
+from qa_agent.langgraph_src.adaptive import contract_thresholds, sample_adaptively
+from qa_agent.langgraph_src.connectors import get_connector, get_engine, fetch_rows, rows_to_table
+from qa_agent.langgraph_src.uniqueness import unique_keys
+from qa_agent.langgraph_src.workspace import Workspace
 
-def get_schema_view(engine, table_name: str, table: pa.Table) -> dict:
+
+SAMPLE_ROWS = 100
+# Contract field types usable as a sample key
+INTEGER_TYPES = ("integer", "int", "bigint", "long")
+
+# Parquet layout of the samples
+PARQUET_COMPRESSION = "zstd"
+ROW_GROUP_BYTES = 64 * 2**20
+# String columns with at most this share of distinct values are dictionary-encoded
+DICTIONARY_MAX_DISTINCT_RATIO = 0.5
+
+
+def get_schema_view(connector, table_name: str, table: pa.Table) -> dict:
     """
-    Returns schema metadata comparing declared DB types vs observed pyarrow types.
+    Returns schema metadata comparing declared source types vs observed pyarrow types.
     """
-    insp = sqlalchemy.inspect(engine)
-    declared_types = {
-        col["name"]: str(col["type"])
-        for col in insp.get_columns(table_name)
-    }
+    declared_types = connector.declared_types(table_name)
     observed_types = {field.name: str(field.type) for field in table.schema}
 
     return {
@@ -46,26 +58,150 @@ def get_table_names(contract: dict) -> list[str]:
         raise ValueError("Models/schema should be dict or list")
 
 
+def parquet_options(table: pa.Table) -> dict:
+    """
+    Writer settings for a sample: zstd, dictionary encoding only for low-cardinality
+    string columns, row groups of about ROW_GROUP_BYTES, and statistics on every column
+    so readers can skip row groups.
+    """
+    dictionary_columns = []
+    for col in table.column_names:
+        column = table[col]
+        if (pa.types.is_string(column.type) or pa.types.is_large_string(column.type)) and len(column):
+            distinct = pa.compute.count_distinct(column).as_py()
+            if distinct <= DICTIONARY_MAX_DISTINCT_RATIO * len(column):
+                dictionary_columns.append(col)
+    row_bytes = table.nbytes / len(table) if len(table) else 1
+    return {
+        "compression": PARQUET_COMPRESSION,
+        "use_dictionary": dictionary_columns,
+        "row_group_size": max(1, int(ROW_GROUP_BYTES // max(row_bytes, 1))),
+        "write_statistics": True,
+    }
+
+
+def write_sample(table: pa.Table, sample_path, table_name: str):
+    """Write a sample as parquet; columns parquet cannot store are cast to strings, one by one."""
+    options = parquet_options(table)
+    try:
+        pq.write_table(table, sample_path, **options)
+        print(f"Sample saved to {sample_path}")
+    except Exception as e:
+        print(f"Error writing parquet for {table_name}: {e}")
+        for i, col in enumerate(table.column_names):
+            try:
+                pq.write_table(table.select([col]), pa.BufferOutputStream())
+            except Exception:
+                table = table.set_column(i, col, pa.compute.cast(table[col], pa.string()))
+                print(f"Column {table_name}.{col} stored as strings")
+        pq.write_table(table, sample_path, **options)
+        print(f"Sample saved to {sample_path}")
+
+
+def get_model_fields(contract: dict, table_name: str) -> dict:
+    """Field name -> field definition of one model in the contract (empty if it lists none)."""
+    models = contract.get("models") or contract.get("schema") or {}
+    model = models.get(table_name, {}) if isinstance(models, dict) else next(
+        (m for m in models if m.get("name") == table_name), {}
+    )
+    fields = model.get("fields") or model.get("properties") or {}
+    if isinstance(fields, list):
+        fields = {f.get("name"): f for f in fields}
+    return {name: f if isinstance(f, dict) else {} for name, f in fields.items()}
+
+
+def get_sample_key(contract: dict, table_name: str) -> str | None:
+    """
+    Integer column that spreads rows over random sample buckets: the model's single-column
+    primary or unique key, or `<table>id` as in the hash_mod rule.
+    """
+    fields = get_model_fields(contract, table_name)
+    keys = [k.columns[0] for k in unique_keys(contract) if k.table == table_name and len(k.columns) == 1]
+    for name in keys + [f"{table_name}id"]:
+        if str(fields.get(name, {}).get("type", "")).lower() in INTEGER_TYPES:
+            return name
+    return None
+
+
+def get_physical_types(contract: dict, table_name: str) -> dict:
+    """Column -> physicalType declared in the contract for one model."""
+    fields = get_model_fields(contract, table_name)
+    return {name: f["physicalType"] for name, f in fields.items() if f.get("physicalType")}
+
+
+def build_profile(table: pa.Table) -> dict:
+    """Null rate, distinct ratio and p01/p99 quantiles of every column."""
+    profile = {
+        "row_count": len(table),
+        "null_rate": {},
+        "distinct_ratio": {},
+        "p01": {},
+        "p99": {},
+    }
+    
+    for col in table.column_names:
+        try:
+            col_data = table.column(col)
+            # Null rate
+            null_count = col_data.null_count
+            profile["null_rate"][col] = float(null_count) / len(table)
+            
+            # Distinct ratio (safe compute)
+            try:
+                unique_vals = pa.compute.unique(col_data)
+                distinct_count = int(pa.compute.count(unique_vals))
+                profile["distinct_ratio"][col] = float(distinct_count) / len(table)
+            except Exception as e:
+                print(f"Warning: Could not compute distinct ratio for {col}: {e}")
+                profile["distinct_ratio"][col] = None
+                
+        except Exception as e:
+            print(f"Warning: Error processing column {col}: {e}")
+            profile["null_rate"][col] = None
+            profile["distinct_ratio"][col] = None
+
+    # Add quantiles for numeric columns only
+    for col in table.column_names:
+        col_data = table.column(col)
+        # Only compute quantiles for integer, float or decimal types
+        if pa.types.is_integer(col_data.type) or pa.types.is_floating(col_data.type) or pa.types.is_decimal(col_data.type):
+            try:
+                # Filter out nulls and get sorted values
+                valid_mask = pa.compute.invert(pa.compute.is_null(col_data))
+                valid_data = pa.compute.filter(col_data, valid_mask)
+                if len(valid_data) > 0:
+                    sorted_indices = pa.compute.sort_indices(valid_data)
+                    idx_01 = max(0, int(len(valid_data) * 0.01) - 1)
+                    idx_99 = min(len(valid_data) - 1, int(len(valid_data) * 0.99))
+                    p01_idx = int(sorted_indices[idx_01].as_py())
+                    p99_idx = int(sorted_indices[idx_99].as_py())
+                    profile["p01"][col] = float(valid_data[p01_idx].as_py())
+                    profile["p99"][col] = float(valid_data[p99_idx].as_py())
+            except Exception as e:
+                print(f"Warning: Could not compute quantiles for {col}: {e}")
+                profile["p01"][col] = None
+                profile["p99"][col] = None
+
+    return profile
+
+
 def sample(
     dataset: str,
     data_contract: str,
     run_id: str | None = None,
+    workspace: Workspace | None = None,
+    server: str | None = None,
+    adaptive: bool = True,
 ):
     # Use provided run_id or default to timestamp
     if run_id is None:
-        run_id = datetime.now().strftime("%Y%m%d%H%M%S")
+        run_id = workspace.run_id if workspace else datetime.now().strftime("%Y%m%d%H%M%S")
+    workspace = (workspace or Workspace(run_id)).create()
 
     contract = load_data_contract(data_contract)
 
-    # Load DB credentials
-    mysql_conf = contract["servers"]["mysql"]
-
-    uri = (
-        f"mysql+pymysql://{mysql_conf['username']}:{mysql_conf['password']}@"
-        f"{mysql_conf['host']}:{mysql_conf['port']}/{mysql_conf['database']}"
-    )
-
-    engine = sqlalchemy.create_engine(uri)
+    # Source of the data: the contract's `server` entry, or its first server
+    connector = get_connector(contract, server)
 
     # Take all table names
     table_names = get_table_names(contract)
@@ -77,121 +213,50 @@ def sample(
     for table_name in table_names:
         seed = 42
         np.random.seed(seed)
-        sampling_rule = "time_window"
+        physical_types = get_physical_types(contract, table_name)
+        # Only the columns the contract declares (all of them if it declares none)
+        columns = list(get_model_fields(contract, table_name)) or None
+        # Tables whose contract states failure-rate thresholds are sampled until they can be judged
+        thresholds = contract_thresholds(contract, table_name) if adaptive else []
+        sampling_rule = "adaptive" if thresholds else "time_window"
+        sampling = None
 
         if sampling_rule == "hash_mod":
-            query = (
-                f"SELECT * FROM {table_name} "
-                f"WHERE MOD({table_name}id, 100) = 0 LIMIT 100;"
-            )
+            # SQL sources only
+            table = connector.scan(table_name, columns=columns, filter=f"MOD({table_name}id, 100) = 0",
+                                   limit=SAMPLE_ROWS, physical_types=physical_types)
         elif sampling_rule == "time_window":
-            query = f"SELECT * FROM {table_name} LIMIT 100;"
+            table = connector.scan(table_name, columns=columns, limit=SAMPLE_ROWS, physical_types=physical_types)
+        elif sampling_rule == "adaptive":
+            # The confidence of the thresholds only holds for a random sample
+            batches = connector.iter_sample_batches(table_name, columns, get_sample_key(contract, table_name),
+                                                    batch_size=SAMPLE_ROWS, physical_types=physical_types, seed=seed)
+            table, sampling = sample_adaptively(batches, thresholds, min_rows=SAMPLE_ROWS)
+            print(f"{table_name}: sampled {sampling['rows']} rows for {len(thresholds)} contract thresholds "
+                  f"({sampling['stopped']})")
         else:
             raise ValueError(f"Unknown sampling rule: {sampling_rule}")
 
-        # Execute query and convert to pyarrow Table
-        with engine.connect() as conn:
-            result = conn.execute(sqlalchemy.text(query))
-            columns = result.keys()
-            rows = result.fetchall()
-
-        # Convert to pyarrow Table with type safety
-        data_dict = {col: [] for col in columns}
-        for row in rows:
-            for i, col in enumerate(columns):
-                data_dict[col].append(row[i])
-        
-        try:
-            # Try to infer types from data
-            table = pa.table(data_dict)
-        except (pa.ArrowTypeError, pa.ArrowInvalid, TypeError) as e:
-            print(f"Warning: Type inference failed for {table_name}, converting to strings: {e}")
-            # Fallback: convert all values to strings
-            safe_dict = {}
-            for col, values in data_dict.items():
-                safe_dict[col] = [str(v) if v is not None else None for v in values]
-            table = pa.table(safe_dict)
-
-        # Save sample using pyarrow parquet with error handling
-        sample_path = f"artifacts/samples/{dataset}.{table_name}.{run_id}.parquet"
-        try:
-            pq.write_table(table, sample_path)
-            print(f"Sample saved to {sample_path}")
-        except Exception as e:
-            print(f"Error writing parquet for {table_name}: {e}")
-            # Fallback: try converting all columns to string type
-            safe_table = table.select([
-                pa.compute.cast(table[col], pa.string()) if not pa.types.is_string(table[col].type) 
-                else table[col]
-                for col in table.column_names
-            ])
-            pq.write_table(safe_table, sample_path)
-            print(f"Sample saved to {sample_path} (with string conversion)")
-
-        # Build profile
-        profile = {
-            "row_count": len(table),
-            "null_rate": {},
-            "distinct_ratio": {},
-            "p01": {},
-            "p99": {},
-        }
-        
-        for col in table.column_names:
-            try:
-                col_data = table.column(col)
-                # Null rate
-                null_count = col_data.null_count
-                profile["null_rate"][col] = float(null_count) / len(table)
-                
-                # Distinct ratio (safe compute)
-                try:
-                    unique_vals = pa.compute.unique(col_data)
-                    distinct_count = int(pa.compute.count(unique_vals))
-                    profile["distinct_ratio"][col] = float(distinct_count) / len(table)
-                except Exception as e:
-                    print(f"Warning: Could not compute distinct ratio for {col}: {e}")
-                    profile["distinct_ratio"][col] = None
-                    
-            except Exception as e:
-                print(f"Warning: Error processing column {col}: {e}")
-                profile["null_rate"][col] = None
-                profile["distinct_ratio"][col] = None
-
-        # Add quantiles for numeric columns only
-        for col in table.column_names:
-            col_data = table.column(col)
-            # Only compute quantiles for integer or float types
-            if pa.types.is_integer(col_data.type) or pa.types.is_floating(col_data.type):
-                try:
-                    # Filter out nulls and get sorted values
-                    valid_mask = pa.compute.invert(pa.compute.is_null(col_data))
-                    valid_data = pa.compute.filter(col_data, valid_mask)
-                    if len(valid_data) > 0:
-                        sorted_indices = pa.compute.sort_indices(valid_data)
-                        idx_01 = max(0, int(len(valid_data) * 0.01) - 1)
-                        idx_99 = min(len(valid_data) - 1, int(len(valid_data) * 0.99))
-                        p01_idx = int(sorted_indices[idx_01].as_py())
-                        p99_idx = int(sorted_indices[idx_99].as_py())
-                        profile["p01"][col] = float(valid_data[p01_idx].as_py())
-                        profile["p99"][col] = float(valid_data[p99_idx].as_py())
-                except Exception as e:
-                    print(f"Warning: Could not compute quantiles for {col}: {e}")
-                    profile["p01"][col] = None
-                    profile["p99"][col] = None
+        # The validator of this run takes the table from memory; the parquet sample is for resumed
+        # and validation-only runs, so it is written before sampling counts as done
+        handoff.put(run_id, dataset, table_name, table)
+        write_sample(table, workspace.sample_path(dataset, table_name), table_name)
 
+        profile = build_profile(table)
+        if sampling is not None:
+            profile["sampling"] = sampling
         combined_profiles[table_name] = profile
 
         # Schema Metadata
         try:
-            schema_metadata = get_schema_view(engine, table_name, table)
+            schema_metadata = get_schema_view(connector, table_name, table)
             combined_schemas[table_name] = schema_metadata
         except Exception as e:
             print(f"Warning: Could not generate schema metadata for {table_name}: {e}")
             combined_schemas[table_name] = {"error": str(e)}
 
     # Save combined profiles
-    profile_path = f"artifacts/profiles/{dataset}.{run_id}.json"
+    profile_path = workspace.profile_path(dataset)
     try:
         with open(profile_path, "w") as f:
             json.dump(combined_profiles, f, indent=2, default=str)
@@ -200,7 +265,7 @@ def sample(
         print(f"Error saving profiles to {profile_path}: {e}")
 
     # Save combined schemas
-    schema_path = f"artifacts/metadata/{dataset}.schema_view.{run_id}.json"
+    schema_path = workspace.schema_path(dataset)
     try:
         with open(schema_path, "w") as f:
             json.dump(combined_schemas, f, indent=2, default=str)
@@ -0,0 +1,99 @@
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.ipc
+
+DEFAULT_PARTITIONS = 64
+
+
+def partition_ids(table: pa.Table, key_columns: list[str], num_partitions: int) -> np.ndarray:
+    """
+    Partition number of every row, from a vectorized hash of its key columns. Keys are hashed
+    as strings: pandas turns an int column into float64 only in batches holding a null, which
+    would send the same value to different partitions depending on its batch.
+    """
+    keys = pd.DataFrame({c: pc.cast(table[c], pa.string()).to_pandas() for c in key_columns})
+    return (pd.util.hash_pandas_object(keys, index=False).to_numpy() % num_partitions).astype(np.int64)
+
+
+class SpillPartitions:
+    """
+    Rows hash-partitioned on their key columns into Arrow IPC files on disk.
+
+    Rows with equal keys always land in the same partition, so each partition can be
+    processed on its own (set membership, duplicate detection) in bounded memory.
+    Partitions are read back memory-mapped. Use as a context manager to remove the
+    spill files afterwards.
+    """
+
+    def __init__(self, key_columns: list[str], num_partitions: int = DEFAULT_PARTITIONS,
+                 spill_dir: str | None = None):
+        self.key_columns = key_columns
+        self.num_partitions = num_partitions
+        self._own_dir = spill_dir is None
+        self.spill_dir = Path(spill_dir or tempfile.mkdtemp(prefix="qa_spill_"))
+        self.spill_dir.mkdir(parents=True, exist_ok=True)
+        self._writers: dict = {}
+        self._sinks: dict = {}
+        self.rows = 0
+
+    def _path(self, partition: int) -> Path:
+        return self.spill_dir / f"part-{partition:05d}.arrow"
+
+    def add(self, table: pa.Table):
+        if not len(table):
+            return
+        ids = partition_ids(table, self.key_columns, self.num_partitions)
+        order = np.argsort(ids, kind="stable")
+        sorted_ids = ids[order]
+        bounds = np.flatnonzero(np.diff(sorted_ids)) + 1
+        for chunk in np.split(order, bounds):
+            partition = int(ids[chunk[0]])
+            part = table.take(pa.array(chunk))
+            if partition not in self._writers:
+                self._sinks[partition] = pa.OSFile(str(self._path(partition)), "wb")
+                self._writers[partition] = pa.ipc.new_file(self._sinks[partition], table.schema)
+            self._writers[partition].write_table(part)
+        self.rows += len(table)
+
+    def close(self):
+        for partition, writer in self._writers.items():
+            writer.close()
+            self._sinks[partition].close()
+        self._writers.clear()
+        self._sinks.clear()
+
+    def read(self, partition: int) -> pa.Table | None:
+        """Rows of one partition, or None if it received none."""
+        path = self._path(partition)
+        if not path.exists():
+            return None
+        with pa.memory_map(str(path)) as source:
+            return pa.ipc.open_file(source).read_all()
+
+    def partitions(self):
+        """(partition, table) for every non-empty partition; closes the writers first."""
+        self.close()
+        for partition in range(self.num_partitions):
+            table = self.read(partition)
+            if table is not None:
+                yield partition, table
+
+    def cleanup(self):
+        self.close()
+        if self._own_dir:
+            shutil.rmtree(self.spill_dir, ignore_errors=True)
+        else:
+            for partition in range(self.num_partitions):
+                self._path(partition).unlink(missing_ok=True)
+
+    def __enter__(self) -> "SpillPartitions":
+        return self
+
+    def __exit__(self, *exc):
+        self.cleanup()
@@ -0,0 +1,288 @@
+import ast
+import json
+from dataclasses import dataclass, field
+
+
+@dataclass
+class Expectation:
+    """One `gx.expectations.ExpectX(...)` call found in suite code."""
+    type: str
+    kwargs: dict
+    meta: dict = field(default_factory=dict)
+    source: str = ""
+
+    @property
+    def column(self):
+        """The column(s) the expectation is about; None for table-level expectations."""
+        if "column" in self.kwargs:
+            return self.kwargs["column"]
+        if "column_A" in self.kwargs:
+            return f"{self.kwargs['column_A']},{self.kwargs.get('column_B')}"
+        if "column_list" in self.kwargs and self.type.startswith(("ExpectCompound", "ExpectMulticolumn", "ExpectSelect")):
+            return ",".join(map(str, self.kwargs["column_list"]))
+        return None
+
+    @property
+    def key(self) -> tuple:
+        return (self.type, self.column)
+
+    @property
+    def signature(self) -> tuple:
+        """(type, column, kwargs) with the kwargs normalized, e.g. value sets compared as sets."""
+        kwargs = dict(self.kwargs)
+        for name in ("value_set", "type_list"):
+            if isinstance(kwargs.get(name), list):
+                kwargs[name] = sorted(kwargs[name], key=repr)
+        return (self.type, self.column, json.dumps(kwargs, sort_keys=True, default=str))
+
+
+@dataclass
+class ParsedSuite:
+    expectations: list
+    # True when calls sit in loops/comprehensions or take non-literal arguments,
+    # i.e. the code cannot be reduced to a fixed list of expectations
+    dynamic: bool = False
+
+
+def _expectation_name(func: ast.expr) -> str | None:
+    name = func.attr if isinstance(func, ast.Attribute) else func.id if isinstance(func, ast.Name) else None
+    # ExpectationSuite / ExpectationConfiguration are not expectations
+    return name if name and name.startswith("Expect") and not name.startswith("Expectation") else None
+
+
+def parse_expectations(code: str) -> ParsedSuite | None:
+    """Expectations constructed in `code`, or None if it is not valid Python."""
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return None
+
+    expectations, dynamic = [], False
+    loops = (ast.For, ast.While, ast.ListComp, ast.GeneratorExp, ast.SetComp, ast.DictComp)
+    loop_calls = {
+        id(n) for loop in ast.walk(tree) if isinstance(loop, loops)
+        for n in ast.walk(loop) if isinstance(n, ast.Call)
+    }
+
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Call):
+            continue
+        exp_type = _expectation_name(node.func)
+        if exp_type is None:
+            continue
+        if id(node) in loop_calls or node.args:
+            dynamic = True
+        kwargs, meta = {}, {}
+        for kw in node.keywords:
+            if kw.arg is None:
+                dynamic = True
+                continue
+            try:
+                value = ast.literal_eval(kw.value)
+            except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+                dynamic = True
+                value = ast.unparse(kw.value)
+            if kw.arg == "meta":
+                meta = value if isinstance(value, dict) else {}
+            else:
+                kwargs[kw.arg] = value
+        expectations.append(Expectation(exp_type, kwargs, meta, ast.get_source_segment(code, node) or ast.unparse(node)))
+
+    return ParsedSuite(expectations, dynamic)
+
+
+def structural_gate(latest_code: str, new_code: str) -> tuple[bool, str] | None:
+    """
+    Decide update_needed by comparing normalized expectation sets when the answer is obvious:
+    no current suite, nothing new, or only expectations for keys the suite does not cover yet.
+    Returns (update_needed, rationale), or None when a semantic judgement is needed.
+    """
+    new = parse_expectations(new_code)
+    if new is None or new.dynamic or not new.expectations:
+        return None
+
+    if not latest_code or latest_code == "<No content>":
+        return True, "There is no existing expectation suite yet."
+    latest = parse_expectations(latest_code)
+    if latest is None or latest.dynamic:
+        return None
+    if not latest.expectations:
+        return True, "The existing suite has no expectations yet."
+
+    latest_sigs = {e.signature for e in latest.expectations}
+    new_sigs = {e.signature for e in new.expectations}
+    if new_sigs <= latest_sigs:
+        return False, "Every generated expectation is already in the suite."
+
+    latest_keys = {e.key for e in latest.expectations}
+    added = [e for e in new.expectations if e.signature not in latest_sigs]
+    if all(e.key not in latest_keys for e in added):
+        described = ", ".join(sorted({f"{e.type}({e.column})" if e.column else e.type for e in added}))
+        return True, f"Adds expectations the suite does not cover yet: {described}."
+
+    # Some existing (type, column) pairs would change parameters: needs a judgement call
+    return None
+
+
+# -------------------- MERGE -------------------- #
+
+DEFAULT_HEADER = '''import great_expectations as gx
+
+context = gx.get_context(mode="file")
+
+suite_name = "expectation_suite"
+suite = gx.ExpectationSuite(name=suite_name)
+suite = context.suites.add(suite)
+'''
+
+
+@dataclass
+class SuiteLayout:
+    """Suite code split into the code around its `<suite>.add_expectation(...)` statements."""
+    header: str
+    footer: str
+    suite_var: str
+    expectations: list
+    # How the code refers to the expectation classes, e.g. "gx.expectations"
+    prefix: str = "gx.expectations"
+
+
+@dataclass
+class MergeResult:
+    code: str
+    added: list
+    replaced: list
+    kept: int
+    resolved: list
+
+
+def _add_expectation_call(stmt: ast.stmt) -> ast.Call | None:
+    """The Expect...() call of a `suite.add_expectation(gx.expectations.ExpectX(...))` statement."""
+    if not (isinstance(stmt, ast.Expr) and isinstance(stmt.value, ast.Call)):
+        return None
+    call = stmt.value
+    if not (isinstance(call.func, ast.Attribute) and call.func.attr == "add_expectation" and len(call.args) == 1):
+        return None
+    inner = call.args[0]
+    return inner if isinstance(inner, ast.Call) and _expectation_name(inner.func) else None
+
+
+def split_suite(code: str) -> SuiteLayout | None:
+    """
+    Header, footer and expectations of suite code, or None when the code is not a flat
+    list of add_expectation statements (syntax errors, loops, helper variables, ...).
+    """
+    parsed = parse_expectations(code)
+    if parsed is None or parsed.dynamic:
+        return None
+    tree = ast.parse(code)
+    lines = code.splitlines(keepends=True)
+
+    positions, suite_var, prefix = [], None, None
+    for i, stmt in enumerate(tree.body):
+        call = _add_expectation_call(stmt)
+        if call is not None:
+            positions.append(i)
+            suite_var = ast.unparse(stmt.value.func.value)
+            if prefix is None:
+                prefix = ast.unparse(call.func.value) if isinstance(call.func, ast.Attribute) else ""
+        elif any(isinstance(n, ast.Call) and _expectation_name(n.func) for n in ast.walk(stmt)):
+            return None
+
+    if not positions:
+        return SuiteLayout(code if code.strip() else DEFAULT_HEADER, "", "suite", [])
+    if positions != list(range(positions[0], positions[-1] + 1)):
+        # Other statements interleaved with the expectations
+        return None
+
+    first, last = tree.body[positions[0]], tree.body[positions[-1]]
+    return SuiteLayout(
+        header="".join(lines[:first.lineno - 1]),
+        footer="".join(lines[last.end_lineno:]),
+        suite_var=suite_var,
+        expectations=parsed.expectations,
+        prefix=prefix,
+    )
+
+
+def render_expectation(exp: Expectation, suite_var: str = "suite", prefix: str = "gx.expectations") -> str:
+    args = ([f"meta={exp.meta!r}"] if exp.meta else []) + [f"{k}={v!r}" for k, v in exp.kwargs.items()]
+    body = ",\n".join(f"        {a}" for a in args)
+    name = f"{prefix}.{exp.type}" if prefix else exp.type
+    return f"{suite_var}.add_expectation(\n    {name}(\n{body}\n    )\n)\n"
+
+
+def _sort_key(exp: Expectation) -> tuple:
+    return (exp.column is not None, str(exp.column or ""), exp.type)
+
+
+def merge_suites(latest_code: str, new_code: str, resolve=None) -> MergeResult | None:
+    """
+    Merge generated expectations into the latest suite by (type, column).
+
+    Identical expectations are deduplicated, a single existing expectation with different
+    parameters is replaced in place, and uncovered keys are appended in a stable order.
+    Keys that cannot be decided mechanically (several differing candidates on either side)
+    are passed to `resolve(conflicts)` as [(key, existing, generated)], which returns the
+    expectations to keep for those keys; without a resolver the existing ones are kept.
+    Returns None when either side is not a flat list of add_expectation statements.
+    """
+    if not latest_code or latest_code == "<No content>":
+        latest_code = DEFAULT_HEADER
+    latest, new = split_suite(latest_code), split_suite(new_code)
+    if latest is None or new is None:
+        return None
+
+    existing: dict = {}
+    for exp in latest.expectations:
+        existing.setdefault(exp.key, []).append(exp)
+    generated: dict = {}
+    for exp in new.expectations:
+        generated.setdefault(exp.key, []).append(exp)
+
+    merged = {key: _dedupe(exps) for key, exps in existing.items()}
+    added, replaced, conflicts = [], [], []
+    for key, candidates in generated.items():
+        candidates = _dedupe(candidates)
+        current = merged.get(key, [])
+        current_sigs = {e.signature for e in current}
+        if all(c.signature in current_sigs for c in candidates):
+            continue
+        if not current and len(candidates) == 1:
+            added.append(candidates[0])
+        elif len(current) == 1 and len(candidates) == 1:
+            merged[key] = candidates
+            replaced.append(key)
+        else:
+            conflicts.append((key, current, candidates))
+
+    resolved = []
+    if conflicts and resolve is not None:
+        chosen = resolve(conflicts) or []
+        for key, _, _ in conflicts:
+            picks = [e for e in chosen if e.key == key]
+            if picks:
+                merged[key] = _dedupe(picks)
+                resolved.append(key)
+
+    body = [e for exps in merged.values() for e in exps] + sorted(added, key=_sort_key)
+    header = latest.header
+    if header.strip() and not header.endswith("\n\n") and not header.rstrip().splitlines()[-1].lstrip().startswith("#"):
+        header = header.rstrip("\n") + "\n\n"
+    code = header + "\n".join(render_expectation(e, latest.suite_var, latest.prefix) for e in body) + latest.footer
+    return MergeResult(
+        code=code,
+        added=[e.key for e in added],
+        replaced=replaced,
+        kept=sum(len(v) for k, v in merged.items() if k not in replaced and k not in resolved),
+        resolved=resolved,
+    )
+
+
+def _dedupe(expectations: list) -> list:
+    seen, unique = set(), []
+    for exp in expectations:
+        if exp.signature not in seen:
+            seen.add(exp.signature)
+            unique.append(exp)
+    return unique
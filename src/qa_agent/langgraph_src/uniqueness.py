@@ -0,0 +1,160 @@
+from dataclasses import dataclass
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from qa_agent.langgraph_src.spill import SpillPartitions
+
+# Key rows held in memory before the keys are hash-partitioned to disk
+MAX_IN_MEMORY_ROWS = 5_000_000
+DUPLICATE_SAMPLE_SIZE = 20
+
+
+@dataclass(frozen=True)
+class UniqueKey:
+    table: str
+    columns: tuple
+
+    @property
+    def check_id(self) -> str:
+        return f"{self.table}:unique:{'+'.join(self.columns)}"
+
+
+def unique_keys(contract: dict) -> list[UniqueKey]:
+    """
+    Unique keys declared in a contract: the model's `primaryKey` (a list, or the fields
+    flagged `primaryKey: true`, compound when there are several), fields with
+    `unique: true`, and `quality: [{rule: unique, field | fields}]` rules.
+    """
+    models = contract.get("models") or contract.get("schema") or {}
+    if isinstance(models, list):
+        models = {m["name"]: m for m in models}
+
+    keys = []
+    for table, model in models.items():
+        model = model or {}
+        fields = model.get("fields") or model.get("properties") or {}
+        if isinstance(fields, list):
+            fields = {f.get("name"): f for f in fields}
+        fields = {name: f or {} for name, f in fields.items()}
+
+        primary = model.get("primaryKey")
+        if isinstance(primary, str):
+            primary = [primary]
+        primary = primary or [name for name, f in fields.items() if f.get("primaryKey") is True]
+        if primary:
+            keys.append(UniqueKey(table, tuple(primary)))
+
+        keys.extend(UniqueKey(table, (name,)) for name, f in fields.items() if f.get("unique") is True)
+
+        for rule in model.get("quality") or []:
+            if rule.get("rule") != "unique":
+                continue
+            columns = rule.get("fields") or ([rule["field"]] if rule.get("field") else [])
+            if columns:
+                keys.append(UniqueKey(table, tuple(columns)))
+
+    return list(dict.fromkeys(keys))
+
+
+def _count_keys(table: pa.Table, columns: list[str]) -> pa.Table:
+    """Duplicated keys of a table with their number of rows."""
+    counts = table.group_by(columns).aggregate([([], "count_all")])
+    return counts.filter(pc.greater(counts["count_all"], 1))
+
+
+def find_duplicates(batches, columns: list[str], max_in_memory: int = MAX_IN_MEMORY_ROWS) -> dict:
+    """
+    Exact duplicate detection over a stream of key-column tables in bounded memory.
+
+    Rows whose key is entirely null are ignored. While the keys fit in `max_in_memory`
+    rows they are grouped in memory; beyond that every row is hash-partitioned to spill
+    files on disk and each partition is grouped on its own, since equal keys always
+    share a partition. Returns the rows checked, the rows whose key occurs more than
+    once (GX's unexpected_count) and a sample of duplicated keys.
+    """
+    held, total, spill = [], 0, None
+    try:
+        for batch in batches:
+            batch = batch.select(columns)
+            nulls = [pc.is_null(batch[c]) for c in columns]
+            all_null = nulls[0]
+            for mask in nulls[1:]:
+                all_null = pc.and_(all_null, mask)
+            batch = batch.filter(pc.invert(all_null))
+            total += len(batch)
+            if spill is not None:
+                spill.add(batch)
+                continue
+            held.append(batch)
+            if total > max_in_memory:
+                spill = SpillPartitions(columns)
+                for t in held:
+                    spill.add(t)
+                held = []
+
+        if spill is None:
+            parts = [pa.concat_tables(held)] if held else []
+        else:
+            parts = (part for _, part in spill.partitions())
+
+        duplicate_rows, samples = 0, []
+        for part in parts:
+            dupes = _count_keys(part, columns)
+            duplicate_rows += pc.sum(dupes["count_all"]).as_py() or 0
+            if len(samples) < DUPLICATE_SAMPLE_SIZE:
+                rows = dupes.select(columns).slice(0, DUPLICATE_SAMPLE_SIZE - len(samples)).to_pylist()
+                samples.extend(r[columns[0]] if len(columns) == 1 else r for r in rows)
+        return {"checked": total, "duplicate_rows": duplicate_rows, "samples": samples}
+    finally:
+        if spill is not None:
+            spill.cleanup()
+
+
+def result_entry(key: UniqueKey, found: dict | None, error: str | None = None) -> dict:
+    """
+    A validation result shaped like GX's unique/compound-unique expectations, over the full table.
+    A key that could not be checked has `success: None`, like unreachable foreign keys.
+    """
+    single = len(key.columns) == 1
+    kwargs = {"column": key.columns[0]} if single else {"column_list": list(key.columns)}
+    payload = {}
+    if found is not None:
+        checked = found["checked"]
+        payload = {
+            "element_count": checked,
+            "unexpected_count": found["duplicate_rows"],
+            "unexpected_percent": 100.0 * found["duplicate_rows"] / checked if checked else 0.0,
+            "partial_unexpected_list": found["samples"],
+        }
+    return {
+        "success": None if error is not None else found["duplicate_rows"] == 0,
+        "expectation_config": {
+            "type": "expect_column_values_to_be_unique" if single else "expect_compound_columns_to_be_unique",
+            "kwargs": {**kwargs, "table": key.table, "scope": "full_table"},
+            "meta": {"check_id": key.check_id},
+        },
+        "result": payload,
+        "exception_info": {"raised_exception": error is not None, "exception_message": error},
+    }
+
+
+def check_uniqueness(contract: dict, connector=None) -> list[dict]:
+    """Check every unique key of the contract over the full source table, one result entry per key."""
+    keys = unique_keys(contract)
+    if not keys:
+        return []
+    if connector is None:
+        from qa_agent.langgraph_src.connectors import get_connector
+        connector = get_connector(contract)
+
+    results = []
+    for key in keys:
+        columns = list(key.columns)
+        try:
+            found = find_duplicates(connector.iter_batches(key.table, columns), columns)
+            results.append(result_entry(key, found))
+        except Exception as e:
+            print(f"Warning: could not check uniqueness of {key.table}({', '.join(columns)}): {e}")
+            results.append(result_entry(key, None, f"{type(e).__name__}: {e}"))
+    return results
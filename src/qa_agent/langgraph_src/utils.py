@@ -1,20 +1,15 @@
-from github import Github
-from base64 import b64decode
-import re, os
+import re
 
-def get_latest_code(filepath, repo_name, branch):
-    token = os.getenv("GITHUB_TOKEN")
-    if not token:
-        raise RuntimeError("Missing GITHUB_TOKEN environment variable")
+from qa_agent.langgraph_src.github_utils import get_default_client, get_file_conditional
 
-    gh = Github(token)
-    repo = gh.get_repo(repo_name)
+def get_latest_code(filepath, repo_name, branch, gh=None):
+    """Latest suite on the branch, served from the ETag cache when unchanged."""
+    gh = gh or get_default_client()
     try:
-        contents = repo.get_contents(filepath, ref=branch)
+        content = get_file_conditional(gh, repo_name, filepath, branch)
     except Exception:
         return "<No content>"
-    file_content = b64decode(contents.content).decode("utf-8")
-    return file_content
+    return content if content is not None else "<No content>"
 
 def extract_python_code(text: str):
     """Extract Python code block from an LLM response."""
@@ -1,7 +1,16 @@
+import copy
 import json
 import yaml
 import great_expectations as gx
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from qa_agent.langgraph_src import handoff, report_store
+from qa_agent.langgraph_src.failing_examples import FailingExampleStore
+from qa_agent.langgraph_src.referential import check_referential_integrity
+from qa_agent.langgraph_src.uniqueness import check_uniqueness
+from qa_agent.langgraph_src.workspace import Workspace
 
 
 def load_data_contract(path: str) -> dict:
@@ -26,46 +35,253 @@ def get_table_names(contract: dict) -> list[str]:
         raise ValueError("Models/schema should be dict or list")
 
 
-def validate(run_id, dataset="raddb", data_contract="contracts/contract.raddb.yaml"):
-    contract = load_data_contract(data_contract)
-    table_names = get_table_names(contract)
+# Kwargs through which an expectation names the columns it reads
+COLUMN_KWARGS = ("column", "column_A", "column_B")
+COLUMN_LIST_KWARGS = ("column_list",)
+
+
+def suite_columns(suite) -> set[str] | None:
+    """
+    Columns the suite's expectations read, or None when some expectation needs them all
+    (table column checks, row conditions).
+    """
+    columns = set()
+    for expectation in suite.expectations:
+        kwargs = dict(expectation.configuration.kwargs)
+        if expectation.expectation_type.startswith("expect_table_column") or kwargs.get("row_condition"):
+            return None
+        columns.update(kwargs[k] for k in COLUMN_KWARGS if kwargs.get(k))
+        for k in COLUMN_LIST_KWARGS:
+            columns.update(kwargs.get(k) or [])
+    return columns
+
+
+def read_sample(path, columns: set[str] | None) -> pd.DataFrame:
+    """A sample with only `columns` (all if None); a table without any of them still keeps its rows."""
+    if columns is None:
+        return pd.read_parquet(path)
+    present = [c for c in pq.read_schema(path).names if c in columns]
+    if not present:
+        return pd.DataFrame(index=range(pq.ParquetFile(path).metadata.num_rows))
+    return pd.read_parquet(path, columns=present)
+
+
+def sample_frame(table: pa.Table, columns: set[str] | None) -> pd.DataFrame:
+    """Like read_sample, for a table the sampler handed over in memory."""
+    if columns is None:
+        return table.to_pandas()
+    present = [c for c in table.column_names if c in columns]
+    if not present:
+        return pd.DataFrame(index=range(len(table)))
+    return table.select(present).to_pandas()
+
+
+# Result formats of two-phase validation: a cheap pass/fail gate over the whole suite,
+# then details for the failing expectations only
+GATE_RESULT_FORMAT = "BOOLEAN_ONLY"
+DETAIL_RESULT_FORMAT = "SUMMARY"
+
+
+def validate_two_phase(batch, suite, detail_format: str = DETAIL_RESULT_FORMAT) -> dict:
+    """
+    Validate with GX's minimal result format, then re-run only the failing expectations with
+    `detail_format` and put their detailed results in place. Passing expectations keep an
+    empty result, so a passing suite costs one cheap pass and yields a small report.
+    """
+    report = batch.validate(suite, result_format=GATE_RESULT_FORMAT).to_json_dict()
+    failed = [i for i, r in enumerate(report["results"]) if not r["success"]]
+    if not failed:
+        return report
+
+    # Results are not in the suite's order: find the expectations by id, and match the
+    # re-run's results (whose copies have no id) by type and kwargs
+    by_id = {e.id: e for e in suite.expectations}
+    failing = [by_id[report["results"][i]["expectation_config"]["id"]] for i in failed]
+    # An expectation belongs to one suite, so the re-run uses copies
+    rerun = gx.ExpectationSuite(name=f"{suite.name}_failures", expectations=[copy.copy(e) for e in failing])
+    detailed = {
+        _config_key(r["expectation_config"]): r
+        for r in batch.validate(rerun, result_format=detail_format).to_json_dict()["results"]
+    }
+    for i in failed:
+        result = detailed.get(_config_key(report["results"][i]["expectation_config"]))
+        if result is None:
+            continue
+        report["results"][i] = {
+            **report["results"][i],
+            "success": result["success"],
+            "result": result["result"],
+            "exception_info": result["exception_info"],
+        }
+    return report
+
+
+def _config_key(config: dict) -> str:
+    return json.dumps([config["type"], config.get("kwargs")], sort_keys=True, default=str)
+
+
+def full_rows(samples: dict, lengths: list[int], row_ids: list[int]) -> pd.DataFrame:
+    """
+    Complete rows, with every sampled column, for positions of the combined frame. `samples`
+    holds each table's Arrow table or parquet path in the order of `lengths`, their row counts.
+    """
+    frames, offset = [], 0
+    for sample, length in zip(samples.values(), lengths):
+        local = [i - offset for i in row_ids if offset <= i < offset + length]
+        if local:
+            table = sample if isinstance(sample, pa.Table) else pq.read_table(sample)
+            frames.append(table.take(pa.array(local)).to_pandas())
+        offset += length
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+def extend_report(report: dict, results: list[dict]):
+    """
+    Append results computed outside GX to a GX report and update its success and statistics.
+    Results with `success: None` could not be evaluated; they are reported but count neither way.
+    """
+    if not results:
+        return
+    report.setdefault("results", []).extend(results)
+    report["success"] = bool(report.get("success", True)) and all(r["success"] is not False for r in results)
+    evaluated = sum(1 for r in report["results"] if r.get("success") is not None)
+    successful = sum(1 for r in report["results"] if r.get("success"))
+    report["statistics"] = {
+        **(report.get("statistics") or {}),
+        "evaluated_expectations": evaluated,
+        "successful_expectations": successful,
+        "unsuccessful_expectations": evaluated - successful,
+        "success_percent": 100.0 * successful / evaluated if evaluated else None,
+    }
+
+
+def run_source_check(path, check) -> list[dict]:
+    """
+    Result entries of a check against the source, computed once per run: repeated validations
+    of the run (e.g. a validation-only re-run) read them from `path` instead of re-reading the source.
+    Results with an unevaluated key are not kept, so the next validation tries again.
+    """
+    if path.exists():
+        with open(path) as f:
+            return json.load(f)
+    results = check()
+    if all(r["success"] is not None for r in results):
+        with open(path, "w") as f:
+            json.dump(results, f)
+    return results
 
-    context = gx.get_context(mode="file")
-    datasource = context.data_sources.add_or_update_pandas(name="my_pandas_datasource")
-    data_asset = datasource.add_dataframe_asset(name="pd_dataframe_asset")
-    batch_definition = data_asset.add_batch_definition_whole_dataframe("batch_definition")
 
-    # Load all table samples and combine into one DataFrame
-    dfs = []
+def load_samples(run_id: str, dataset: str, table_names: list[str], workspace: Workspace,
+                 columns: set[str] | None) -> tuple[pd.DataFrame, dict, list[int]]:
+    """
+    The run's samples with only `columns` as one DataFrame, each table's sample (Arrow table or
+    parquet path) and each table's row count. Tables sampled by this process are taken from memory.
+    """
+    dfs, samples = [], {}
     for table_name in table_names:
-        path = f"artifacts/samples/{dataset}.{table_name}.{run_id}.parquet"
-        dfs.append(pd.read_parquet(path))
+        table = handoff.get(run_id, dataset, table_name)
+        samples[table_name] = table if table is not None else workspace.sample_path(dataset, table_name)
+        dfs.append(sample_frame(table, columns) if table is not None else read_sample(samples[table_name], columns))
     if not dfs:
         raise ValueError("No sample files found to validate")
+    return pd.concat(dfs, ignore_index=True), samples, [len(frame) for frame in dfs]
+
+
+def _get_batch(context, df: pd.DataFrame):
+    datasource = context.data_sources.add_or_update_pandas(name="my_pandas_datasource")
+    data_asset = datasource.add_dataframe_asset(name="pd_dataframe_asset")
+    batch_definition = data_asset.add_batch_definition_whole_dataframe("batch_definition")
+    return batch_definition.get_batch(batch_parameters={"dataframe": df})
 
-    df = pd.concat(dfs, ignore_index=True)
+
+def _raised(exception_info: dict | None) -> str | None:
+    """The exception message of a result, whether GX reports one exception or one per metric."""
+    infos = [exception_info or {}]
+    if "raised_exception" not in infos[0]:
+        infos = [i for i in infos[0].values() if isinstance(i, dict)]
+    return next((i.get("exception_message") or "raised" for i in infos if i.get("raised_exception")), None)
+
+
+def suite_error(gx_root, run_id: str, dataset: str, data_contract: str) -> str | None:
+    """
+    Why the suite in the GX project at `gx_root` cannot be validated against the run's samples,
+    or None when it can. Expectations that fail on the data are fine; a missing suite or an
+    expectation that raises (e.g. on a column the samples do not have) is not.
+    """
+    try:
+        context = gx.get_context(mode="file", project_root_dir=str(gx_root))
+        suite = context.suites.get("expectation_suite")
+        table_names = get_table_names(load_data_contract(data_contract))
+        df, _, _ = load_samples(run_id, dataset, table_names, Workspace(run_id), suite_columns(suite))
+        report = _get_batch(context, df).validate(suite, result_format=GATE_RESULT_FORMAT).to_json_dict()
+    except Exception as e:
+        return f"Suite does not validate: {type(e).__name__}: {e}"
+    for result in report["results"]:
+        message = _raised(result.get("exception_info"))
+        if message is not None:
+            return f"{result['expectation_config']['type']} raised during validation: {message}"
+    return None
+
+
+def validate(run_id, dataset="raddb", data_contract="contracts/contract.raddb.yaml", workspace: Workspace | None = None,
+             two_phase: bool = True, detail_format: str = DETAIL_RESULT_FORMAT):
+    workspace = (workspace or Workspace(run_id)).create()
+    contract = load_data_contract(data_contract)
+    table_names = get_table_names(contract)
+
+    # The suite was built by the generated code inside this run's own GX project
+    context = gx.get_context(mode="file", project_root_dir=str(workspace.gx_root))
 
     # Get expectation suite from context
     suite = context.suites.get("expectation_suite")
 
-    batch = batch_definition.get_batch(batch_parameters={"dataframe": df})
-    results = batch.validate(suite)
+    # Load all table samples, reading only the columns the suite uses, and combine into one DataFrame
+    columns = suite_columns(suite)
+    df, samples, lengths = load_samples(run_id, dataset, table_names, workspace, columns)
+
+    batch = _get_batch(context, df)
+    if two_phase:
+        report = validate_two_phase(batch, suite, detail_format)
+    else:
+        report = batch.validate(suite, result_format=detail_format).to_json_dict()
+
+    # Foreign keys span tables, so they are checked per table pair against the source, not on the combined frame
+    try:
+        extend_report(report, run_source_check(
+            workspace.source_check_path(dataset, "referential"),
+            lambda: check_referential_integrity(contract, samples),
+        ))
+    except Exception as e:
+        print(f"Warning: referential integrity checks skipped: {e}")
+
+    # Declared keys are checked for uniqueness over the full source tables, out of core
+    try:
+        extend_report(report, run_source_check(
+            workspace.source_check_path(dataset, "uniqueness"),
+            lambda: check_uniqueness(contract),
+        ))
+    except Exception as e:
+        print(f"Warning: uniqueness checks skipped: {e}")
 
-    output_path = f"artifacts/sandbox/{dataset}.{run_id}.report.json"
+    output_path = workspace.report_path(dataset)
     with open(output_path, "w") as f:
-        json.dump(results.to_json_dict(), f, indent=2)
+        json.dump(report, f, separators=(",", ":"))
 
     print(f"✅ Validation report saved to {output_path}")
 
-    # Save unexpected rows
-    unexpected_rows = []
-    for result in results['results']:
-        unexpected_rows.extend(result['result'].get('partial_unexpected_index_list') or [])
+    # Index per-expectation results for cross-run history queries
+    rows = report_store.append_run(report, dataset=dataset, run_id=run_id)
+    print(f"✅ {rows} expectation results appended to the report store")
 
-    unexpected_df = df.iloc[unexpected_rows]
-    failing_path = f"artifacts/failing_examples/{dataset}.{run_id}.csv"
-    unexpected_df.head(5).to_csv(failing_path, index=False)
+    # Save a bounded, per-expectation sample of failing rows
+    store = FailingExampleStore(reservoir_size=20)
+    store.add_results(report['results'])
+    failing_path = workspace.failing_examples_path(dataset, "parquet")
+    index_path = workspace.failing_examples_path(dataset, "index.json")
+    # The suite only needed some columns; failing examples keep the whole row for context
+    lookup = (lambda row_ids: full_rows(samples, lengths, row_ids)) if columns is not None else None
+    store.write(df, failing_path, index_path, lookup=lookup)
 
-    print(f"✅ Failing examples saved to {failing_path}")
+    print(f"✅ Failing examples saved to {failing_path} (index: {index_path})")
 
-    return results.to_json_dict()
+    return report
@@ -0,0 +1,65 @@
+from dataclasses import dataclass
+from pathlib import Path
+
+ARTIFACTS_ROOT = "artifacts"
+
+# Per-run artifact folders, created under artifacts/runs/<run_id>/
+ARTIFACT_KINDS = ("samples", "profiles", "metadata", "proposals", "failing_examples", "sandbox")
+
+
+@dataclass(frozen=True)
+class Workspace:
+    """
+    Isolated directories of a single run: its artifacts and its own GX project.
+
+    Everything a run writes lives under artifacts/runs/<run_id>/, so several runs
+    can execute on the same host without clobbering each other's suites or samples.
+    Cross-run stores (reports, caches, checkpoints) stay directly under artifacts/.
+    """
+    run_id: str
+    root: str = ARTIFACTS_ROOT
+
+    @property
+    def run_dir(self) -> Path:
+        return Path(self.root) / "runs" / self.run_id
+
+    @property
+    def gx_root(self) -> Path:
+        """Project root for GX file mode; the context itself lives in gx_root/gx."""
+        return self.run_dir / "gx_project"
+
+    def path(self, kind: str, filename: str) -> Path:
+        if kind not in ARTIFACT_KINDS:
+            raise ValueError(f"Unknown artifact kind: {kind}")
+        return self.run_dir / kind / filename
+
+    def sample_path(self, dataset: str, table_name: str) -> Path:
+        return self.path("samples", f"{dataset}.{table_name}.{self.run_id}.parquet")
+
+    def profile_path(self, dataset: str) -> Path:
+        return self.path("profiles", f"{dataset}.{self.run_id}.json")
+
+    def schema_path(self, dataset: str) -> Path:
+        return self.path("metadata", f"{dataset}.schema_view.{self.run_id}.json")
+
+    def proposals_path(self, dataset: str) -> Path:
+        return self.path("proposals", f"{dataset}.{self.run_id}.json")
+
+    def report_path(self, dataset: str) -> Path:
+        return self.path("sandbox", f"{dataset}.{self.run_id}.report.json")
+
+    def suite_path(self, dataset: str) -> Path:
+        """Working copy of the suite that the run generates and repairs; published to output_path."""
+        return self.path("sandbox", f"{dataset}_suite.py")
+
+    def source_check_path(self, dataset: str, check: str) -> Path:
+        return self.path("sandbox", f"{dataset}.{self.run_id}.{check}.json")
+
+    def failing_examples_path(self, dataset: str, suffix: str) -> Path:
+        return self.path("failing_examples", f"{dataset}.{self.run_id}.{suffix}")
+
+    def create(self) -> "Workspace":
+        for kind in ARTIFACT_KINDS:
+            (self.run_dir / kind).mkdir(parents=True, exist_ok=True)
+        self.gx_root.mkdir(parents=True, exist_ok=True)
+        return self
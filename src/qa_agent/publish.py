@@ -0,0 +1,68 @@
+import json
+from pathlib import Path
+
+from qa_agent.langgraph_src.workspace import Workspace
+
+
+def failing_example_files(dataset: str, workspace: Workspace) -> dict:
+    """Failing-example artifacts of a run, keyed by their path in the target repo."""
+    files = {}
+    for suffix in ("parquet", "index.json"):
+        local_path = workspace.failing_examples_path(dataset, suffix)
+        if local_path.exists():
+            files[f"failing_examples/{local_path.name}"] = local_path.read_bytes() if suffix == "parquet" else local_path.read_text()
+    return files
+
+
+def write_publish_dir(workspace: Workspace, files: dict, title: str, body: str) -> str:
+    """Write a PR's files and description to the run's publish/ folder instead of opening it."""
+    publish_dir = workspace.run_dir / "publish"
+    for name, content in files.items():
+        # Repo paths stay as they are; an absolute path would replace publish_dir, so only its file name is kept
+        path = publish_dir / "files" / (Path(name).name if Path(name).is_absolute() else name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if isinstance(content, bytes):
+            path.write_bytes(content)
+        else:
+            path.write_text(content)
+    (publish_dir / "pull_request.md").write_text(f"# {title}\n\n{body}\n")
+    return str(publish_dir)
+
+
+def run_validation_only(params: dict):
+    """
+    Validate an existing suite against the samples of a previous run and open a PR with the report,
+    or write it to the run's publish/ folder on a dry run.
+    Needs neither the LLM stack nor langgraph, so the CLI can call it directly.
+    """
+    from qa_agent.langgraph_src.validator import validate
+    from qa_agent.langgraph_src.github_utils import (
+        create_branch,
+        commit_files,
+        create_pull_request,
+        get_default_client,
+    )
+
+    owner, repo, dataset = params["owner"], params["repo"], params["dataset"]
+    contract, run_id = params["contract"], params["run_id"]
+    base_branch = params.get("base_branch", "main")
+
+    workspace = Workspace(run_id)
+    results = validate(run_id=run_id, dataset=dataset, data_contract=contract, workspace=workspace)
+    files = {
+        "report.json": json.dumps(results, indent=2),
+        **failing_example_files(dataset, workspace),
+    }
+    title, pr_body = "Validation Report", f"Validation results for run {run_id}"
+    if params.get("dry_run"):
+        print(f"✅ Dry run, pull request written to {write_publish_dir(workspace, files, title, pr_body)}")
+        return results
+
+    gh = get_default_client()
+    repo = gh.get_repo(f"{owner}/{repo}")
+    branch = f"bot/{run_id}"
+    create_branch(repo, branch, base_branch=base_branch)
+    commit_files(repo, branch, files, "Validation results")
+    pr = create_pull_request(repo, head=branch, base=base_branch, title=title, body=pr_body, draft=True)
+    print(f"✅ Pull request created: {pr.html_url}")
+    return results
@@ -0,0 +1,194 @@
+import argparse
+import json
+import signal
+import sqlite3
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+QUEUE_PATH = "artifacts/queue.sqlite"
+
+
+class JobQueue:
+    """
+    A small SQLite-backed job queue. Producers `submit` workflow params,
+    the worker `claim`s them one at a time and records when each job
+    was enqueued, started and finished.
+    """
+
+    def __init__(self, path: str = QUEUE_PATH):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._lock = threading.Lock()
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                params TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'queued',
+                enqueued_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL,
+                error TEXT
+            )
+            """
+        )
+
+    def submit(self, params: dict) -> int:
+        with self._lock:
+            cur = self._conn.execute(
+                "INSERT INTO jobs (params, enqueued_at) VALUES (?, ?)",
+                (json.dumps(params), time.time()),
+            )
+            return cur.lastrowid
+
+    def claim(self) -> dict | None:
+        """Atomically move the oldest queued job to running and return it."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT id, params, enqueued_at FROM jobs WHERE status = 'queued' ORDER BY id LIMIT 1"
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                started_at = time.time()
+                self._conn.execute(
+                    "UPDATE jobs SET status = 'running', started_at = ? WHERE id = ?",
+                    (started_at, row[0]),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return {"id": row[0], "params": json.loads(row[1]), "enqueued_at": row[2], "started_at": started_at}
+
+    def finish(self, job_id: int, error: str | None = None):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, error = ? WHERE id = ?",
+                ("failed" if error else "done", time.time(), error, job_id),
+            )
+
+    def recover(self) -> int:
+        """Requeue jobs left running by a worker that died mid-job."""
+        with self._lock:
+            cur = self._conn.execute(
+                "UPDATE jobs SET status = 'queued', started_at = NULL WHERE status = 'running'"
+            )
+            return cur.rowcount
+
+    def stats(self) -> dict:
+        """Job counts by status and queue-wait / run latency percentiles of finished jobs."""
+        with self._lock:
+            counts = dict(self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+            rows = self._conn.execute(
+                "SELECT started_at - enqueued_at, finished_at - started_at FROM jobs WHERE finished_at IS NOT NULL"
+            ).fetchall()
+        return {
+            "counts": counts,
+            "queue_wait": _percentiles([r[0] for r in rows]),
+            "run_time": _percentiles([r[1] for r in rows]),
+        }
+
+
+def _percentiles(values: list[float]) -> dict:
+    if not values:
+        return {}
+    if len(values) == 1:
+        return {"p50": round(values[0], 3), "p95": round(values[0], 3), "max": round(values[0], 3)}
+    cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return {"p50": round(cuts[49], 3), "p95": round(cuts[94], 3), "max": round(max(values), 3)}
+
+
+def serve(queue: JobQueue, concurrency: int = 1, poll_interval: float = 1.0):
+    """
+    Keep langchain, langgraph, GX and the model/GitHub clients loaded and
+    run queued jobs through workflow_entry with at most `concurrency` in flight.
+    """
+    warm_started = time.perf_counter()
+    from qa_agent.batch import run_job  # imports qa_agent.workflow and everything it pulls in
+    print(f"Worker warm in {time.perf_counter() - warm_started:.2f}s")
+
+    requeued = queue.recover()
+    if requeued:
+        print(f"Requeued {requeued} job(s) left running by a previous worker")
+
+    stop = threading.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: stop.set())
+
+    slots = threading.Semaphore(concurrency)
+
+    def execute(job: dict):
+        try:
+            outcome = run_job(job["params"])
+            queue.finish(job["id"], outcome["error"])
+            wait = job["started_at"] - job["enqueued_at"]
+            print(
+                f"{'✅' if outcome['status'] == 'ok' else '❌'} job {job['id']} "
+                f"({job['params']['dataset']}): waited {wait:.2f}s, ran {outcome['seconds']}s"
+            )
+        finally:
+            slots.release()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        while not stop.is_set():
+            if not slots.acquire(timeout=poll_interval):
+                continue
+            job = queue.claim()
+            if job is None:
+                slots.release()
+                stop.wait(poll_interval)
+                continue
+            pool.submit(execute, job)
+        print("Stopping worker, waiting for running jobs to finish...")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Persistent QA worker fed by a local SQLite job queue.")
+    parser.add_argument("--queue", default=QUEUE_PATH)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = sub.add_parser("serve", help="Run the worker")
+    serve_parser.add_argument("--concurrency", type=int, default=2)
+    serve_parser.add_argument("--poll_interval", type=float, default=1.0)
+
+    submit_parser = sub.add_parser("submit", help="Enqueue a job")
+    submit_parser.add_argument("--owner", required=1)
+    submit_parser.add_argument("--repo", required=1)
+    submit_parser.add_argument("--dataset", required=1)
+    submit_parser.add_argument("--contract", required=1)
+    submit_parser.add_argument("--output_path")
+    submit_parser.add_argument("--base_branch", default='main')
+    submit_parser.add_argument("--mode", default='default')
+    submit_parser.add_argument("--run_id")
+
+    sub.add_parser("stats", help="Show job counts and latency")
+    args = parser.parse_args()
+
+    queue = JobQueue(args.queue)
+    if args.command == "serve":
+        serve(queue, concurrency=args.concurrency, poll_interval=args.poll_interval)
+    elif args.command == "submit":
+        job_id = queue.submit({
+            "owner": args.owner,
+            "repo": args.repo,
+            "dataset": args.dataset,
+            "output_path": args.output_path or f"expectations/{args.dataset}_suite.py",
+            "contract": args.contract,
+            "base_branch": args.base_branch,
+            "mode": args.mode,
+            "run_id": args.run_id,
+        })
+        print(f"Queued job {job_id}")
+    else:
+        print(json.dumps(queue.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
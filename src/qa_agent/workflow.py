@@ -0,0 +1,634 @@
+import subprocess
+import json
+import shutil
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from dotenv import load_dotenv
+
+from langgraph.func import entrypoint, task
+from langchain.agents import create_agent
+from pydantic import BaseModel, Field
+
+from qa_agent.langgraph_src.prompt import (
+    GENERATE_CHECKS_PROMPT_TEMPLATE,
+    GENERATE_GX_SUITE_TEMPLATE,
+    GENERATE_GX_SUITE_TEMPLATE_SINGLE,
+    GATER_PROMPT,
+    UPDATE_CODE_PROMPT,
+    CRAFT_PULL_REQUEST_PROMPT,
+    FIX_ERROR_PROMPT
+)
+from qa_agent.langgraph_src.utils import get_latest_code, extract_python_code
+from qa_agent.langgraph_src.validator import suite_error, validate
+from qa_agent.langgraph_src.github_utils import (
+    create_branch,
+    commit_files,
+    create_pull_request,
+    get_default_client,
+)
+from qa_agent.langgraph_src.models import get_model
+from qa_agent.langgraph_src.cascade import (
+    MIN_PR_BODY_CHARS,
+    SHORT_PROMPT_CHARS,
+    cascade,
+    compiles,
+    is_trivial_error,
+    record_outcome,
+)
+from qa_agent.langgraph_src import handoff, sampler
+from qa_agent.langgraph_src.suite_ast import (
+    merge_suites,
+    parse_expectations,
+    render_expectation,
+    structural_gate,
+)
+from qa_agent.langgraph_src.drift import (
+    accepted_profile_path,
+    contract_changed,
+    load_accepted_profile,
+    load_local_profile,
+    profile_drift,
+    with_contract_hash,
+)
+from qa_agent.langgraph_src.fix_cache import FixCache, expectation_count
+from qa_agent.langgraph_src.workspace import Workspace
+from qa_agent.publish import failing_example_files, run_validation_only, write_publish_dir
+
+# Load environment variables
+env_path = Path.cwd() / ".env"
+load_dotenv(env_path)
+
+class GaterOutput(BaseModel):
+    update_needed: bool = Field(description="Whether an update to the expectation suite is needed.")
+    rationale: str = Field(description="Rationale for the decision.")
+
+# -------------------- TASKS -------------------- #
+
+@task
+def propose_quality_checks(data_contract: str, data_profile: str) -> str:
+    response = get_model("writer").invoke(
+        GENERATE_CHECKS_PROMPT_TEMPLATE.format(contract=data_contract, profile=data_profile)
+    )
+    return response.content
+
+@task
+def generate_quality_code(checks: str, metadata:str, framework: str) -> str:
+    response = get_model("coder").invoke(
+        GENERATE_GX_SUITE_TEMPLATE.format(proposals=checks, metadata=metadata)
+    )
+    return response.content
+
+@task
+def generate_quality_code_single(contract: str) -> str:
+    response = get_model("coder").invoke(
+        GENERATE_GX_SUITE_TEMPLATE_SINGLE.format(contract=contract)
+    )
+    return response.content
+
+_gater_agent = None
+_gater_agent_model = None
+_gater_agent_lock = threading.Lock()
+
+def get_gater_agent():
+    """
+    The structured-output gater agent, shared by every run. It is rebuilt when the writer
+    model changes, e.g. after models.reset_models() switched cassettes.
+    """
+    global _gater_agent, _gater_agent_model
+    model = get_model("writer")
+    with _gater_agent_lock:
+        if _gater_agent is None or _gater_agent_model is not model:
+            _gater_agent = create_agent(model, response_format=GaterOutput)
+            _gater_agent_model = model
+        return _gater_agent
+
+@task
+def gater(contract: str, latest_code: str, expectation_snippets: str) -> str:
+    # Obvious cases (nothing new, only additions, no suite yet) are decided without the model
+    decision = structural_gate(latest_code, extract_python_code(expectation_snippets))
+    if decision is not None:
+        update_needed, rationale = decision
+        print(f"✅ Structural gate decided without the model: {rationale}")
+        return GaterOutput(update_needed=update_needed, rationale=rationale)
+
+    result = get_gater_agent().invoke({
+        "messages": GATER_PROMPT.format(
+            contract=contract,
+            latest_code=latest_code,
+            expectation_snippets=expectation_snippets
+        )
+    })
+    return result["structured_response"]
+
+@task
+def update_expectation_suite(contract: str, latest_code: str, expectation_snippets: str) -> str:
+    response = get_model("coder").invoke(
+        UPDATE_CODE_PROMPT.format(
+            contract=contract,
+            latest_code=latest_code,
+            expectation_snippets=expectation_snippets
+        )
+    )
+    return response.content
+
+@task
+def fix_errors_in_code(code: str, error_message: str, approach: str = "", escalate: bool = False) -> tuple[str, str]:
+    """The model's fixed code and the tier that wrote it, so whether the fix runs can be recorded against the tier."""
+    prompt = FIX_ERROR_PROMPT.format(
+        code=code,
+        error_message=error_message
+    )
+    if approach:
+        prompt += f"\n\nApproach: {approach}"
+
+    def call(model):
+        return model.invoke(prompt).content
+
+    def accept(response):
+        fixed = extract_python_code(response)
+        return compiles(fixed) and fixed.strip() != code.strip()
+
+    # Import, name and syntax errors go to the fast tier first, unless an earlier fix already failed to run
+    return cascade("fix_errors_in_code", "coder", call, accept,
+                   fast_first=not escalate and is_trivial_error(error_message))
+
+@task
+def craft_pr_body(results: dict, old_code: str, new_code: str, data_contract: str) -> str:
+    prompt = CRAFT_PULL_REQUEST_PROMPT.format(
+        results=json.dumps(results, indent=2),
+        old_code=old_code,
+        new_code=new_code,
+        data_contract=data_contract
+    )
+    body, _ = cascade("craft_pr_body", "writer", lambda model: model.invoke(prompt).content,
+                      lambda body: len(body.strip()) >= MIN_PR_BODY_CHARS,
+                      fast_first=len(prompt) <= SHORT_PROMPT_CHARS)
+    return body
+
+# -------------------- HELPER -------------------- #
+
+def limit_dict_depth(data, max_depth: int = 4, current_depth: int = 0):
+    """Limit dictionary depth to specified levels."""
+    if current_depth >= max_depth:
+        return str(data) if not isinstance(data, (dict, list)) else "..."
+    
+    if isinstance(data, dict):
+        return {k: limit_dict_depth(v, max_depth, current_depth + 1) for k, v in data.items()}
+    elif isinstance(data, list):
+        return [limit_dict_depth(item, max_depth, current_depth + 1) for item in data]
+    return data
+
+def merge_expectations(contract: str, latest_code: str, expectation_snippets: str) -> str:
+    """
+    Merge the generated snippets into the latest suite by (type, column). The coder model
+    only settles conflicting keys, or rewrites the whole suite if it cannot be merged structurally.
+    """
+    def resolve(conflicts):
+        existing = "\n".join(render_expectation(e) for _, current, _ in conflicts for e in current)
+        generated = "\n".join(render_expectation(e) for _, _, candidates in conflicts for e in candidates)
+        response = update_expectation_suite(
+            contract=contract,
+            latest_code=existing,
+            expectation_snippets=generated
+        ).result()
+        parsed = parse_expectations(extract_python_code(response))
+        return parsed.expectations if parsed else []
+
+    merged = merge_suites(latest_code, extract_python_code(expectation_snippets), resolve=resolve)
+    if merged is None:
+        print("❌ Suite cannot be merged structurally, regenerating it with the model.")
+        updated_code = update_expectation_suite(
+            contract=contract,
+            latest_code=latest_code,
+            expectation_snippets=expectation_snippets
+        ).result()
+        return extract_python_code(updated_code)
+
+    print(f"✅ Merged suite: {len(merged.added)} added, {len(merged.replaced)} replaced, "
+          f"{len(merged.resolved)} resolved by the model, {merged.kept} kept.")
+    return merged.code
+
+# Speculative repair candidates differ by the approach their prompt asks for, cycled when more
+# candidates are requested. Temperature is not varied: GPT-5 reasoning models only accept the default.
+REPAIR_APPROACHES = (
+    "",
+    "Change as little as possible: fix only the statement the error points to.",
+    "Check every Great Expectations call against the GX 1.x API and correct all that would fail the same way.",
+    "If the failing expectation cannot work as written, replace it with an equivalent built-in expectation.",
+)
+CANDIDATE_POLL_SECONDS = 0.05
+
+def run_candidates(codes: list[str], sandboxes: list[Path], check=None) -> tuple[int | None, list[str], list]:
+    """
+    Run candidate suites concurrently, each in its own GX project root. Returns the index of
+    the first candidate that exits cleanly and passes `check(sandbox)` (the others are killed),
+    every candidate's stderr, or the reason `check` rejected it, and whether each candidate
+    worked (None for those killed before they finished).
+    """
+    procs, stderr_paths = [], []
+    for code, sandbox in zip(codes, sandboxes):
+        shutil.rmtree(sandbox, ignore_errors=True)
+        sandbox.mkdir(parents=True)
+        (sandbox / "suite.py").write_text(code)
+        stderr_paths.append(sandbox / "stderr.txt")
+        # stderr goes to a file so a chatty candidate cannot block on a full pipe
+        with open(stderr_paths[-1], "w") as err:
+            procs.append(subprocess.Popen([sys.executable, "suite.py"], cwd=sandbox,
+                                          stdout=subprocess.DEVNULL, stderr=err))
+
+    winner, running, rejected = None, set(range(len(procs))), {}
+    outcomes = [None] * len(procs)
+    while running and winner is None:
+        for i in sorted(running):
+            if procs[i].poll() is not None:
+                running.discard(i)
+                outcomes[i] = False
+                if procs[i].returncode != 0:
+                    continue
+                rejected[i] = check(sandboxes[i]) if check is not None else None
+                if rejected[i] is None:
+                    winner, outcomes[i] = i, True
+                    break
+        else:
+            time.sleep(CANDIDATE_POLL_SECONDS)
+
+    for i in running:
+        procs[i].kill()
+        procs[i].wait()
+    return winner, [rejected.get(i) or p.read_text() for i, p in enumerate(stderr_paths)], outcomes
+
+def execute_suite(filepath: str, workspace: Workspace) -> subprocess.CompletedProcess:
+    """Run a suite file from scratch in the run's GX project root."""
+    shutil.rmtree(workspace.gx_root / "gx", ignore_errors=True)
+    return subprocess.run([sys.executable, filepath], capture_output=True, text=True, cwd=workspace.gx_root)
+
+def apply_cached_fix(filepath: str, workspace: Workspace, code: str, stderr: str, cache: FixCache) -> str | None:
+    """
+    Try the repairs cached for this error; returns the first patched code that runs, with the file
+    left at it. A patch that drops or adds expectations would "fix" a suite by deleting the failing
+    check, so it counts as a failure without being run.
+    """
+    expected = expectation_count(code)
+    for signature, patch_id, patched in cache.candidates(code, stderr):
+        if expectation_count(patched) != expected:
+            cache.record(signature, patch_id, False)
+            continue
+        with open(filepath, "w") as f:
+            f.write(patched)
+        ok = execute_suite(filepath, workspace).returncode == 0
+        cache.record(signature, patch_id, ok)
+        if ok:
+            print(f"✅ Applied a cached fix for: {signature}")
+            return patched
+    with open(filepath, "w") as f:
+        f.write(code)
+    return None
+
+def run_python_file(filepath: str, workspace: Workspace, max_attempts: int = 5, candidates: int = 1,
+                    cache: FixCache | None = None, check=None) -> str:
+    """
+    Run a Python file inside the run's GX project root and return its code, attempting fixes on failure.
+    The generated code calls gx.get_context(mode="file"), which resolves against the working directory.
+
+    Repairs that worked in earlier runs for the same error are tried first, without a model call;
+    model fixes that make the code run are added to that cache.
+
+    With candidates > 1 each failed attempt requests that many fixes concurrently (each asked for a
+    different approach) and runs them side by side in sandbox GX projects; the first one that runs
+    cleanly and passes `check(gx_root)` wins and its GX project replaces the run's.
+    """
+    attempt = 0
+    cache = cache or FixCache()
+    filepath = str(Path(filepath).resolve())
+    with open(filepath, "r") as f:
+        code = f.read()
+
+    proc = execute_suite(filepath, workspace)
+    if proc.returncode == 0:
+        return code  # Successfully ran
+    stderr = proc.stderr
+
+    while attempt < max_attempts:
+        print(f"❌ Error in generated code. Attempt {attempt + 1}/{max_attempts}")
+        print(stderr)
+        attempt += 1
+
+        patched = apply_cached_fix(filepath, workspace, code, stderr, cache)
+        if patched is not None:
+            return patched
+        broken, broken_stderr = code, stderr
+
+        if candidates > 1:
+            # Calling the task without .result() lets the candidate fixes run concurrently
+            approaches = [REPAIR_APPROACHES[i % len(REPAIR_APPROACHES)] for i in range(candidates)]
+            futures = [fix_errors_in_code(code, stderr, approach=a, escalate=attempt > 1) for a in approaches]
+            responses = [future.result() for future in futures]
+            fixes = [extract_python_code(response) for response, _ in responses]
+            sandboxes = [workspace.path("sandbox", f"repair-{attempt}-{i}") for i in range(candidates)]
+            winner, errors, outcomes = run_candidates(fixes, sandboxes, check)
+            for (_, tier), worked in zip(responses, outcomes):
+                if worked is not None:
+                    record_outcome("fix_errors_in_code", tier, worked)
+            if winner is not None:
+                code = fixes[winner]
+                with open(filepath, "w") as f:
+                    f.write(code)
+                shutil.rmtree(workspace.gx_root / "gx", ignore_errors=True)
+                shutil.copytree(sandboxes[winner] / "gx", workspace.gx_root / "gx")
+                print(f"✅ Repair candidate {winner + 1}/{candidates} ran and validated cleanly.")
+                cache.learn(broken_stderr, broken, code)
+                return code
+            # Keep repairing from the first candidate
+            code, stderr = fixes[0], errors[0]
+            with open(filepath, "w") as f:
+                f.write(code)
+            continue
+
+        # A fix that did not run escalates the next one to the strong tier
+        response, tier = fix_errors_in_code(code, stderr, escalate=attempt > 1).result()
+        code = extract_python_code(response)
+        with open(filepath, "w") as f:
+            f.write(code)
+        proc = execute_suite(filepath, workspace)
+        record_outcome("fix_errors_in_code", tier, proc.returncode == 0)
+        if proc.returncode == 0:
+            cache.learn(broken_stderr, broken, code)
+            return code  # Successfully ran
+        stderr = proc.stderr
+
+    raise RuntimeError("Failed to run generated code after multiple attempts.")
+
+@task
+def repair_suite(filepath: str, run_id: str, max_attempts: int = 5, candidates: int = 1,
+                 dataset: str | None = None, contract: str | None = None,
+                 fix_cache_path: str | None = None) -> str:
+    """
+    Run the suite and repair it until it runs, as one checkpointed stage: the number of fix
+    calls varies from run to run, so a resumed run must not replay them one by one.
+    Speculative candidates must also validate against the run's samples of `dataset`.
+    `fix_cache_path` replaces the shared fix cache, e.g. with a fresh file per benchmark run.
+    """
+    check = None
+    if candidates > 1 and dataset and contract:
+        check = lambda gx_root: suite_error(gx_root, run_id, dataset, contract)
+    cache = FixCache(fix_cache_path) if fix_cache_path else None
+    return run_python_file(filepath, Workspace(run_id), max_attempts, candidates, check=check, cache=cache)
+
+@task
+def sample_dataset(dataset: str, contract: str, run_id: str) -> str:
+    sampler.sample(dataset=dataset, data_contract=contract, run_id=run_id, workspace=Workspace(run_id))
+    return run_id
+
+@task
+def validate_suite(run_id: str, dataset: str, contract: str) -> dict:
+    return validate(run_id=run_id, dataset=dataset, data_contract=contract, workspace=Workspace(run_id))
+
+@task
+def open_pull_request(owner: str, repo: str, branch: str, base_branch: str, files: dict,
+                      commit_message: str, title: str, body: str) -> str:
+    gh = get_default_client()
+    repo_obj = gh.get_repo(f"{owner}/{repo}")
+
+    create_branch(repo_obj, branch, base_branch=base_branch)
+    commit_files(repo_obj, branch, files, commit_message)
+    pr = create_pull_request(repo_obj, head=branch, base=base_branch, title=title, body=body, draft=True)
+    return pr.html_url
+
+@task
+def write_pull_request_locally(run_id: str, files: dict, title: str, body: str) -> str:
+    """Dry-run stand-in for open_pull_request: the PR contents go to the run's publish/ folder."""
+    return write_publish_dir(Workspace(run_id), files, title, body)
+
+def publish(params: dict, run_id: str, branch: str, files: dict, commit_message: str, title: str, body: str,
+            suite_path: Path | None = None) -> str:
+    """
+    Open the PR, or write its contents locally when the run is a dry run. Once the PR is open,
+    the run's working copy of the suite replaces the local file at output_path.
+    """
+    if params.get("dry_run"):
+        return write_pull_request_locally(run_id, files, title, body).result()
+    pr_url = open_pull_request(
+        params["owner"], params["repo"], branch, params.get("base_branch", "main"),
+        files=files, commit_message=commit_message, title=title, body=body,
+    ).result()
+    if suite_path is not None:
+        Path(params["output_path"]).parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(suite_path, params["output_path"])
+    return pr_url
+
+# -------------------- MAIN ENTRYPOINT -------------------- #
+
+def workflow(params: dict):
+    run_id = params.get("run_id") or datetime.now().strftime("%Y%m%d%H%M%S")
+    try:
+        return run_stages(params, run_id)
+    finally:
+        # The sampled tables handed to the validator in memory are not needed after the run,
+        # however it was started (run_workflow, a benchmark streaming the entrypoint) or ended
+        handoff.release(run_id)
+
+def run_stages(params: dict, run_id: str):
+    mode = params.get("mode", "default")
+    owner, repo, dataset = params["owner"], params["repo"], params["dataset"]
+    output_path, contract = params["output_path"], params["contract"]
+    base_branch = params.get("base_branch", "main")
+    # A caller-provided run_id means "reuse that run's samples" unless stated otherwise
+    reuse_samples = params.get("reuse_samples", bool(params.get("run_id")))
+
+    # Every artifact and the GX project of this run live in its own workspace
+    workspace = Workspace(run_id).create()
+    # Concurrent runs on the same dataset share output_path, so each one works on its own copy
+    suite_path = workspace.suite_path(dataset)
+
+    # Run sampler unless the samples of run_id are reused
+    if not reuse_samples:
+        sample_dataset(dataset=dataset, contract=contract, run_id=run_id).result()
+
+    with open(contract) as f:
+        data_contract = f.read()
+
+    if mode == "single":
+        code = generate_quality_code_single(contract=data_contract).result()
+        code = extract_python_code(code)
+
+        with open(suite_path, "w") as f:
+            f.write(code)
+
+        # Verify generated code runs before committing
+        updated_code = repair_suite(str(suite_path), run_id, 1, params.get("repair_candidates", 1),
+                                    dataset=dataset, contract=contract,
+                                    fix_cache_path=params.get("fix_cache_path")).result()
+
+        # Validate generated expectations against sampled data
+        results = validate_suite(run_id=run_id, dataset=dataset, contract=contract).result()
+        pr_results = limit_dict_depth(results, max_depth=2)
+
+        pr_body = f"Automated Great Expectations suite generated from contract: {contract}\n\nValidation summary\n{json.dumps(pr_results, indent=2)}"
+        pr_url = publish(
+            params, run_id, f"bot/single-{run_id}",
+            files={
+                output_path: code,
+                "report.json": json.dumps(results, indent=2),
+                **failing_example_files(dataset, workspace),
+            },
+            commit_message="Single-agent update",
+            title="Auto-GX: Single Mode",
+            body=pr_body,
+            suite_path=suite_path,
+        )
+        print(f"✅ Pull request created: {pr_url}")
+    else:
+        if reuse_samples:
+            # Skip generation, assume code is at output_path
+            run_validation_only({**params, "run_id": run_id})
+        else:
+            # Load profiles & contracts
+            with open(workspace.profile_path(dataset)) as f:
+                data_profile = json.load(f)
+            with open(workspace.schema_path(dataset)) as f:
+                metadata = f.read()
+
+            # Skip every model call when neither the contract nor the data changed since the accepted suite
+            if not params.get("force"):
+                if params.get("dry_run"):
+                    accepted_profile = load_local_profile(params.get("accepted_profile_path"))
+                else:
+                    accepted_profile = load_accepted_profile(dataset, output_path, f"{owner}/{repo}", base_branch)
+                if accepted_profile is not None and contract_changed(accepted_profile, data_contract):
+                    print("Contract changed since the accepted suite.")
+                elif accepted_profile is not None:
+                    drifts = profile_drift(data_profile, accepted_profile, params.get("drift_tolerances"))
+                    if not drifts:
+                        print("✅ No contract change or profile drift since the accepted suite, skipping generation.")
+                        return
+                    print(f"Profile drift in {len(drifts)} metric(s):")
+                    for d in drifts[:20]:
+                        print(f"  {d['table']}.{d['column']} {d['metric']}: {d['accepted']} -> {d['current']}")
+
+            # Generate quality checks and code
+            checks = propose_quality_checks(data_contract, data_profile).result()
+            with open(workspace.proposals_path(dataset), "w") as f:
+                f.write(checks)
+
+            code = generate_quality_code(checks, metadata=metadata, framework="Great Expectations").result()
+
+            # Load latest code and run gater
+            if params.get("dry_run"):
+                # Offline: the currently accepted suite is a local file, if any
+                latest_path = params.get("latest_code_path")
+                latest_code = Path(latest_path).read_text() if latest_path and Path(latest_path).exists() else ""
+            else:
+                latest_code = get_latest_code(
+                    filepath=f"expectations/{dataset}_suite.py",
+                    repo_name=f"{owner}/{repo}",
+                    branch=base_branch
+                )
+
+            gater_response = gater(
+                contract=data_contract,
+                latest_code=latest_code,
+                expectation_snippets=code
+            ).result()
+
+            if gater_response.update_needed:
+                print("✅ Update needed.")
+                branch = f"bot/{run_id}"
+                updated_code = merge_expectations(data_contract, latest_code, code)
+
+                with open(suite_path, "w") as f:
+                    f.write(updated_code)
+
+                # Ensure code runs
+                updated_code = repair_suite(str(suite_path), run_id, candidates=params.get("repair_candidates", 1),
+                                            dataset=dataset, contract=contract,
+                                            fix_cache_path=params.get("fix_cache_path")).result()
+
+                results = validate_suite(run_id=run_id, dataset=dataset, contract=contract).result()
+                pr_results = limit_dict_depth(results, max_depth=2)
+
+                pr_body = craft_pr_body(pr_results, latest_code, updated_code, data_contract).result()
+                pr_url = publish(
+                    params, run_id, branch,
+                    files={
+                        output_path: updated_code,
+                        # Becomes the drift baseline once the PR is merged
+                        accepted_profile_path(dataset, output_path): json.dumps(
+                            with_contract_hash(data_profile, data_contract), indent=2),
+                        "report.json": json.dumps(results, indent=2),
+                        **failing_example_files(dataset, workspace),
+                    },
+                    commit_message="Automated update",
+                    title="WIP: Automated update",
+                    body=pr_body,
+                    suite_path=suite_path,
+                )
+                print(f"✅ Pull request created: {pr_url}")
+            else:
+                print("❌ No update needed.")
+                print(gater_response.rationale)
+
+
+workflow_entry = entrypoint()(workflow)
+
+# -------------------- CHECKPOINTED RUNS -------------------- #
+
+CHECKPOINT_PATH = "artifacts/checkpoints.sqlite"
+
+_checkpointed: dict = {}
+_checkpointed_lock = threading.Lock()
+
+
+def get_checkpointed_workflow(checkpoint_path: str = CHECKPOINT_PATH):
+    """
+    The workflow backed by a local SQLite checkpointer. Completed @task results are
+    persisted per thread (= run_id), so a resumed run only re-executes unfinished stages.
+    """
+    with _checkpointed_lock:
+        if checkpoint_path not in _checkpointed:
+            from langgraph.checkpoint.sqlite import SqliteSaver
+
+            Path(checkpoint_path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(checkpoint_path, check_same_thread=False)
+            _checkpointed[checkpoint_path] = entrypoint(checkpointer=SqliteSaver(conn))(workflow)
+        return _checkpointed[checkpoint_path]
+
+
+_issued_run_ids: set = set()
+
+
+def new_run_id(workflow_with_checkpoints) -> str:
+    """Timestamp run id, suffixed when another run in this process or on disk already uses it."""
+    base = datetime.now().strftime("%Y%m%d%H%M%S")
+    with _checkpointed_lock:
+        run_id, n = base, 1
+        while run_id in _issued_run_ids or workflow_with_checkpoints.checkpointer.get_tuple(
+            {"configurable": {"thread_id": run_id}}
+        ):
+            n += 1
+            run_id = f"{base}-{n}"
+        _issued_run_ids.add(run_id)
+    return run_id
+
+
+def run_workflow(params: dict | None = None, resume: str | None = None, checkpoint_path: str = CHECKPOINT_PATH):
+    """
+    Start a checkpointed run, or resume the run with id `resume` from its last checkpoint.
+    The run_id is fixed before the first invocation so a resumed run sees the same paths.
+    """
+    workflow_with_checkpoints = get_checkpointed_workflow(checkpoint_path)
+    if resume:
+        config = {"configurable": {"thread_id": resume}}
+        if workflow_with_checkpoints.checkpointer.get_tuple(config) is None:
+            raise ValueError(f"No checkpoint found for run {resume}")
+        print(f"↩️  Resuming run {resume}")
+        return workflow_with_checkpoints.invoke(None, config=config)
+
+    run_id = params.get("run_id") or new_run_id(workflow_with_checkpoints)
+    params = {**params, "run_id": run_id, "reuse_samples": bool(params.get("run_id"))}
+    config = {"configurable": {"thread_id": run_id}}
+    return workflow_with_checkpoints.invoke(params, config=config)
+
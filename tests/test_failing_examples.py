@@ -0,0 +1,22 @@
+from qa_agent.langgraph_src.failing_examples import expectation_key
+
+
+def _result(type_, batch_id="a", **kwargs):
+    return {"success": False, "expectation_config": {"type": type_, "kwargs": {"batch_id": batch_id, **kwargs}}}
+
+
+def test_expectation_key_does_not_depend_on_position_or_batch():
+    first = [_result("expect_column_values_to_not_be_null", column="id"),
+             _result("expect_column_values_to_be_between", column="id", min_value=0)]
+    reordered = [_result("expect_column_values_to_be_between", batch_id="b", min_value=0, column="id"),
+                 _result("expect_column_values_to_not_be_null", batch_id="b", column="id")]
+    assert sorted(map(expectation_key, first)) == sorted(map(expectation_key, reordered))
+
+    same_column = _result("expect_column_values_to_be_between", column="id", min_value=1)
+    assert expectation_key(same_column) != expectation_key(first[1])
+
+
+def test_expectation_key_prefers_check_id():
+    result = _result("expect_column_values_to_not_be_null", column="id")
+    result["expectation_config"]["meta"] = {"check_id": "id_not_null"}
+    assert expectation_key(result) == "id_not_null"
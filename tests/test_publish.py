@@ -0,0 +1,20 @@
+import json
+
+from qa_agent import publish
+from qa_agent.langgraph_src import github_utils, validator
+
+
+def test_dry_run_validation_writes_locally(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(validator, "validate", lambda **kwargs: {"success": True})
+
+    def no_github():
+        raise AssertionError("a dry run must not reach GitHub")
+
+    monkeypatch.setattr(github_utils, "get_default_client", no_github)
+    params = {"owner": "o", "repo": "r", "dataset": "d", "contract": "c", "run_id": "r1", "dry_run": True}
+    assert publish.run_validation_only(params) == {"success": True}
+
+    publish_dir = tmp_path / "artifacts" / "runs" / "r1" / "publish"
+    assert json.loads((publish_dir / "files" / "report.json").read_text()) == {"success": True}
+    assert (publish_dir / "pull_request.md").read_text().startswith("# Validation Report")
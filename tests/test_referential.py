@@ -0,0 +1,20 @@
+import pyarrow as pa
+
+from qa_agent.langgraph_src.referential import find_orphans
+
+
+def _parents():
+    # The first batch holds a null, which pandas would turn into a float64 column
+    return [
+        pa.table({"id": pa.array(list(range(8)) + [None], pa.int64())}),
+        pa.table({"id": pa.array(range(8, 12), pa.int64())}),
+        pa.table({"id": pa.array([None, 12, 13], pa.int64())}),
+    ]
+
+
+def test_spilled_orphans_match_in_memory():
+    child = pa.array([10, 11, 3, 13, 99, None, 42], pa.int64())
+    in_memory = find_orphans(iter(_parents()), child)
+    spilled = find_orphans(iter(_parents()), child, max_in_memory=5)
+    assert sorted(in_memory.to_pylist()) == [42, 99]
+    assert sorted(spilled.to_pylist()) == sorted(in_memory.to_pylist())
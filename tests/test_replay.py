@@ -0,0 +1,12 @@
+from langchain_core.messages import HumanMessage
+
+from qa_agent.langgraph_src.replay import prompt_key
+
+
+def test_prompt_key_ignores_absolute_directories():
+    def key(root):
+        error = f'File "{root}/artifacts/runs/bench-raddb/sandbox/raddb_suite.py", line 12\nNameError: gx'
+        return prompt_key("coder", [HumanMessage(content=error)])
+
+    assert key("/root/package/case_studies") == key("/home/ci/checkout/case_studies")
+    assert prompt_key("coder", [HumanMessage(content="a.py")]) != prompt_key("coder", [HumanMessage(content="b.py")])
@@ -0,0 +1,29 @@
+import pyarrow as pa
+
+from qa_agent.langgraph_src.uniqueness import find_duplicates
+
+
+def _batches():
+    # The first batch holds a null, which pandas would turn into a float64 column
+    return [
+        pa.table({"k": pa.array([1, 2, None, 7], pa.int64()), "j": pa.array([1, 1, 1, 2], pa.int64())}),
+        pa.table({"k": pa.array([1, 2, 3, 7], pa.int64()), "j": pa.array([1, 1, 1, None], pa.int64())}),
+        pa.table({"k": pa.array([None, 3, 8], pa.int64()), "j": pa.array([1, 1, 2], pa.int64())}),
+    ]
+
+
+def test_spilled_duplicates_match_in_memory():
+    columns = ["k", "j"]
+    in_memory = find_duplicates(iter(_batches()), columns)
+    spilled = find_duplicates(iter(_batches()), columns, max_in_memory=1)
+    assert in_memory["duplicate_rows"] == 8
+    assert spilled["checked"] == in_memory["checked"]
+    assert spilled["duplicate_rows"] == in_memory["duplicate_rows"]
+    assert sorted(map(str, spilled["samples"])) == sorted(map(str, in_memory["samples"]))
+
+
+def test_spilled_single_column_duplicates_match_in_memory():
+    in_memory = find_duplicates(iter(_batches()), ["k"])
+    spilled = find_duplicates(iter(_batches()), ["k"], max_in_memory=1)
+    assert spilled["duplicate_rows"] == in_memory["duplicate_rows"] == 8
+    assert sorted(spilled["samples"]) == sorted(in_memory["samples"]) == [1, 2, 3, 7]